@@ -0,0 +1,61 @@
+"""Convergence benchmark of the numerical engines against the closed form.
+
+Usage:
+    python -m benchmarks.bench_engines --output engines.json
+
+For each lattice size and path count, prices the value grid of the app's default
+inputs and reports the largest absolute error against BlackScholes.evaluate_grid,
+the median time and, for Monte Carlo, the largest standard error.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List
+import numpy as np
+from benchmarks.bench_pricing import git_commit, measure
+from black_scholes.BlackScholes import BlackScholes
+from black_scholes.engines import BinomialEngine, MonteCarloEngine
+
+MODEL_INPUTS = (30.0, 125, 20.0, 0.01, 0.3, 100) # the app's defaults
+BINOMIAL_STEPS = [50, 100, 200, 400, 800, 1600]
+MONTE_CARLO_PATHS = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def convergence(binomial_steps: List[int], monte_carlo_paths: List[int], min_time: float, max_repeat: int) -> Dict[str, Dict]:
+    model = BlackScholes(*MODEL_INPUTS)
+    closed_form = np.array(model.evaluate_grid(("Value",))["Value"])
+    spot = np.array(model.price_range_display)[:, np.newaxis]
+    t = np.array(model.time_list_display)[np.newaxis, :]/365
+    results = {}
+    engines = [(f"binomial[{steps}]", BinomialEngine(steps, american=False)) for steps in binomial_steps]
+    engines += [(f"monte_carlo[{paths}]", MonteCarloEngine(paths)) for paths in monte_carlo_paths]
+    for name, engine in engines:
+        price = lambda: engine.option_values(spot, t, *MODEL_INPUTS[2:5])
+        stats = measure(price, min_time, max_repeat)
+        stats["max_abs_error"] = float(np.abs(np.array(price()) - closed_form).max())
+        if isinstance(engine, MonteCarloEngine):
+            stats["max_standard_error"] = float(np.max(engine.simulate(spot, t, *MODEL_INPUTS[2:5])[2:]))
+        results[name] = stats
+        print(f"{name:<24} error {stats['max_abs_error']:.2e}  p50 {stats['p50']*1e3:10.3f} ms"
+              + (f"  stderr {stats['max_standard_error']:.2e}" if "max_standard_error" in stats else ""))
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", nargs="+", type=int, default=BINOMIAL_STEPS, help="binomial lattice sizes")
+    parser.add_argument("--paths", nargs="+", type=int, default=MONTE_CARLO_PATHS, help="Monte Carlo path counts")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds spent timing each case")
+    parser.add_argument("--max-repeat", type=int, default=20, help="maximum timed runs per case")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = convergence(args.steps, args.paths, args.min_time, args.max_repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"metadata": {"commit": git_commit(), "model_inputs": MODEL_INPUTS}, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
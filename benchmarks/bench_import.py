@@ -0,0 +1,96 @@
+"""Measures cold start: the import time of each module and the time to the first
+priced grid, each in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.bench_import --output imports.json
+    python -m benchmarks.bench_import --compare imports.json
+
+Import times come from `python -X importtime`, the cumulative microseconds of the
+imported module including everything it pulls in. Each case also lists the heavy
+third-party packages it loaded, which should be none for the pricing modules.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+from benchmarks.bench_pricing import compare, git_commit
+
+MODULES = ["numpy", "black_scholes", "black_scholes.BlackScholes", "black_scholes.batch",
+           "black_scholes.implied_vol", "black_scholes.scenario", "black_scholes.storage",
+           "black_scholes.cache", "black_scholes.charts", "black_scholes.service"]
+# (name, statement): end to end cold starts, timed as the wall clock of the whole interpreter
+STARTUPS = [("first_price", "from black_scholes.BlackScholes import BlackScholes; "
+                            "BlackScholes(30.0, 365, 40.0, 0.01, 0.3, 90).calculate_price()")]
+HEAVY_PACKAGES = ("scipy", "pandas", "matplotlib", "seaborn", "altair", "pyarrow", "streamlit")
+
+
+def import_time(module: str) -> Tuple[float, List[str]]:
+    """Imports module in a fresh interpreter
+
+    Returns:
+        Tuple[float, List[str]]: cumulative import time in seconds and the heavy packages loaded
+    """
+    statement = f"import sys, {module}; print(','.join(sorted(m for m in sys.modules if m in {HEAVY_PACKAGES!r})))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True)
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            cumulative = int(fields[1])
+    return cumulative*1e-6, [package for package in result.stdout.strip().split(",") if package]
+
+
+def startup_time(statement: str) -> Tuple[float, List[str]]:
+    statement += f"; import sys; print(','.join(sorted(m for m in sys.modules if m in {HEAVY_PACKAGES!r})))"
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, [package for package in result.stdout.strip().split(",") if package]
+
+
+def run(repeat: int) -> Dict[str, object]:
+    results = {}
+    cases = [(f"import[{module}]", lambda module=module: import_time(module)) for module in MODULES]
+    cases += [(f"startup[{name}]", lambda statement=statement: startup_time(statement)) for name, statement in STARTUPS]
+    for key, func in cases:
+        timings = []
+        for _ in range(repeat):
+            seconds, loaded = func()
+            timings.append(seconds)
+        timings = np.asarray(timings)
+        results[key] = {"runs": repeat, "mean": float(timings.mean()), "p50": float(np.percentile(timings, 50)),
+                        "min": float(timings.min()), "heavy_packages": loaded}
+        print(f"{key:<40} p50 {results[key]['p50']*1e3:9.1f} ms  min {results[key]['min']*1e3:9.1f} ms  "
+              f"loads {', '.join(loaded) or '-'}")
+    return {"metadata": {"commit": git_commit(), "python": platform.python_version(),
+                         "numpy": np.__version__, "platform": platform.platform(),
+                         "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")},
+            "results": results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7, help="fresh interpreters per case")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    current = run(args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), current, args.threshold)
+        if regressions:
+            print("Regressions:\n" + "\n".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
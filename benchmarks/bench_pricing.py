@@ -0,0 +1,163 @@
+"""Benchmarks the pricing, Greek, P/L, batch and implied volatility kernels
+across grid sizes.
+
+Usage:
+    python -m benchmarks.bench_pricing --output baseline.json
+    python -m benchmarks.bench_pricing --compare baseline.json --output current.json
+
+Each case reports throughput in cells per second, latency percentiles and the
+peak memory traced during one extra run. With --compare, cases whose median
+latency regressed beyond --threshold are listed and the exit status is 1.
+"""
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from black_scholes.BlackScholes import BlackScholes
+from black_scholes.batch import price_batch
+from black_scholes.implied_vol import implied_volatility
+from black_scholes.vectorized import GREEKS
+
+# (spot prices, days to expiry); the last size is 10^6 cells
+GRID_SIZES = [(19, 7), (100, 100), (500, 365), (1000, 1000)]
+# list based APIs build one Python float per cell, skip them beyond this size
+LIST_API_MAX_CELLS = 200_000
+
+
+def measure(func: Callable[[], object], min_time: float, max_repeat: int) -> Dict[str, float]:
+    """Times func until min_time has elapsed or max_repeat runs, then traces one
+    more run for its peak memory.
+
+    Returns:
+        Dict[str, float]: latency percentiles in seconds, run count and peak memory in bytes
+    """
+    func() # warm up
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_repeat and (time.perf_counter() - start < min_time or len(timings) < 3):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings = np.asarray(timings)
+    return {"runs": int(timings.size), "mean": float(timings.mean()),
+            "p50": float(np.percentile(timings, 50)), "p95": float(np.percentile(timings, 95)),
+            "p99": float(np.percentile(timings, 99)), "peak_memory_bytes": int(peak)}
+
+
+def grid_cases(spot_steps: int, time_steps: int) -> List[Tuple[str, Callable[[], object]]]:
+    # models keep their evaluated terms, so each run builds a fresh one
+    new_model = lambda: BlackScholes(30.0, 365, 40.0, 0.01, 0.3, 90, price_steps=spot_steps, time_steps=time_steps)
+    incremental = new_model()
+    incremental.evaluate_grid()
+    volatilities = itertools.cycle(np.linspace(0.2, 0.4, 101))
+
+    def update_volatility():
+        incremental.update(volatility=next(volatilities))
+        return incremental.evaluate_grid()
+
+    cases = [("evaluate_grid", lambda: new_model().evaluate_grid()),
+             ("update[volatility]", update_volatility)]
+    if spot_steps*time_steps <= LIST_API_MAX_CELLS:
+        call_values, _ = new_model().calculate_price()
+        cases.append(("calculate_price", lambda: new_model().calculate_price()))
+        cases.extend((f"calculate_greeks[{greek}]", lambda greek=greek: new_model().calculate_greeks(greek)) for greek in GREEKS)
+        cases.append(("calculate_pnl[P/L $]", lambda: BlackScholes.calculate_pnl(call_values, 15.0, 'P/L $')))
+        cases.append(("calculate_pnl[P/L %]", lambda: BlackScholes.calculate_pnl(call_values, 15.0, 'P/L %')))
+    return cases
+
+
+def batch_cases(size: int) -> List[Tuple[str, Callable[[], object]]]:
+    rng = np.random.default_rng(0)
+    S = np.full(size, 100.0)
+    K = rng.uniform(60, 160, size)
+    T = rng.uniform(0.05, 2, size)
+    sigma = rng.uniform(0.1, 0.9, size)
+    kind = np.where(rng.random(size) < 0.5, "c", "p")
+    prices = price_batch(S, K, T, 0.02, sigma, kind)["price"]
+    return [("price_batch", lambda: price_batch(S, K, T, 0.02, sigma, kind)),
+            ("implied_volatility", lambda: implied_volatility(prices, S, K, T, 0.02, kind))]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(sizes: List[Tuple[int, int]], min_time: float, max_repeat: int) -> Dict[str, object]:
+    results = {}
+    for spot_steps, time_steps in sizes:
+        cells = spot_steps*time_steps
+        for name, func in grid_cases(spot_steps, time_steps) + batch_cases(cells):
+            key = f"{name}@{spot_steps}x{time_steps}"
+            stats = measure(func, min_time, max_repeat)
+            stats["cells"] = cells
+            stats["cells_per_second"] = cells/stats["p50"]
+            results[key] = stats
+            print(f"{key:<40} p50 {stats['p50']*1e3:10.3f} ms  p99 {stats['p99']*1e3:10.3f} ms  "
+                  f"{stats['cells_per_second']:14,.0f} cells/s  peak {stats['peak_memory_bytes']/2**20:9.1f} MiB")
+    return {"metadata": {"commit": git_commit(), "python": platform.python_version(),
+                         "numpy": np.__version__, "platform": platform.platform(),
+                         "processor": platform.processor(), "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")},
+            "results": results}
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object], threshold: float) -> List[str]:
+    """Lists the cases whose median latency grew by more than threshold (e.g. 0.1 for 10%)
+
+    Returns:
+        List[str]: one line per regressed case
+    """
+    regressions = []
+    for key, stats in current["results"].items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        ratio = stats["p50"]/previous["p50"]
+        print(f"{key:<40} {ratio:6.2f}x baseline")
+        if ratio > 1 + threshold:
+            regressions.append(f"{key}: p50 {previous['p50']*1e3:.3f} ms -> {stats['p50']*1e3:.3f} ms")
+    return regressions
+
+
+def parse_size(size: str) -> Tuple[int, int]:
+    spot_steps, time_steps = size.lower().split("x")
+    return int(spot_steps), int(time_steps)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=GRID_SIZES, help="grid sizes as SPOTxDAYS, e.g. 19x7 500x365")
+    parser.add_argument("--min-time", type=float, default=0.5, help="minimum seconds spent timing each case")
+    parser.add_argument("--max-repeat", type=int, default=1000, help="maximum timed runs per case")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes, args.min_time, args.max_repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), current, args.threshold)
+        if regressions:
+            print("Regressions:\n" + "\n".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,154 @@
-from typing import Tuple, List
+from typing import TYPE_CHECKING, Dict, Iterable, Tuple, List, Optional
 import numpy as np
-from scipy.stats import norm
+from black_scholes.pnl import LONG, PNL_DENOMINATIONS, pnl, premium_outlay
+from black_scholes.storage import write_grid_arrow, write_grid_npy, write_grid_parquet
+from black_scholes.incremental import IncrementalGrid
+from black_scholes.instrumentation import count, stage
+from black_scholes.vectorized import GREEKS, OUTPUTS
+if TYPE_CHECKING:
+    from black_scholes.engines import PricingEngine
 class BlackScholes:
     def __init__(self, current_underlying_price, 
                  time_to_exp_days, strike_price, 
                  risk_free_rate, volatility, 
-                 price_range_to_display) -> None:
+                 price_range_to_display,
+                 price_steps: Optional[int] = None,
+                 time_steps: Optional[int] = None,
+                 engine: Optional["PricingEngine"] = None) -> None:
+        """
+        Args:
+            price_steps (Optional[int]): number of evenly spaced spot prices to display. Defaults to the 19-row integer percentage grid.
+            time_steps (Optional[int]): number of evenly spaced days to expiry to display. Defaults to the 7-column grid.
+            engine (Optional[PricingEngine]): numerical engine pricing the grids, e.g. BinomialEngine(). Defaults to the closed form.
+        """
         self.current_underlying_price = current_underlying_price
         self.time_to_exp_days = time_to_exp_days
         self.strike_price = strike_price
         self.risk_free_rate = risk_free_rate
         self.volatility = volatility
+        self.price_range_to_display = price_range_to_display
+        self.price_steps = price_steps
+        self.time_steps = time_steps
+        self.engine = engine
         self.d1 = None
         self.d2 = None
+        self._grid = None
+        self._engine_grid = (None, {})
+        with stage("build_axes"):
+            self._build_time_list()
+            self._build_price_range()
+
+    def _build_time_list(self) -> None:
+        time_to_exp_days = self.time_to_exp_days
         self.time_list_display = []
-        if time_to_exp_days < 7:
+        if self.time_steps is not None:
+            self.time_list_display = np.linspace(time_to_exp_days, time_to_exp_days/self.time_steps, self.time_steps).tolist()
+        elif time_to_exp_days < 7:
             self.time_list_display = [d for d in range(time_to_exp_days,0,-1)]
         else:
             self.time_list_display = [time_to_exp_days - (n*(np.ceil(time_to_exp_days/7))) for n in range(0,7)]
+
+    def _build_price_range(self) -> None:
+        price_range_to_display = self.price_range_to_display
         self.price_range_display = []
         positive_bound = price_range_to_display
         negative_bound = price_range_to_display
         if price_range_to_display >= 100:
             negative_bound = -1*max(-98, -1*price_range_to_display)
-        step_size = np.ceil((negative_bound + positive_bound)/18).astype(np.int64)
-        self.price_range_display = [self.current_underlying_price +self.current_underlying_price*(p/100) for p in range(positive_bound, -1*negative_bound-1,-1*step_size)]
-        self.perc_price_range_display = [p for p in range(-1*negative_bound, positive_bound,step_size)]
-        
+        if self.price_steps is not None:
+            percentages = np.linspace(positive_bound, -1*negative_bound, self.price_steps)
+            self.price_range_display = (self.current_underlying_price + self.current_underlying_price*(percentages/100)).tolist()
+            self.perc_price_range_display = percentages[::-1].tolist()
+        else:
+            step_size = np.ceil((negative_bound + positive_bound)/18).astype(np.int64)
+            self.price_range_display = [self.current_underlying_price +self.current_underlying_price*(p/100) for p in range(positive_bound, -1*negative_bound-1,-1*step_size)]
+            self.perc_price_range_display = [p for p in range(-1*negative_bound, positive_bound,step_size)]
+
+    def update(self, **inputs) -> None:
+        """Changes some of the constructor's inputs, e.g. update(volatility=0.4).
+        Display axes are rebuilt only when their inputs change, and the next grid
+        evaluation recomputes only the terms depending on what changed. Spot rows are
+        reused only where their price is unchanged, which the default axis rarely keeps
+        when price_range_to_display changes, since its row spacing grows with the range.
+        """
+        unknown = set(inputs) - {"current_underlying_price", "time_to_exp_days", "strike_price", "risk_free_rate",
+                                 "volatility", "price_range_to_display", "price_steps", "time_steps", "engine"}
+        if unknown:
+            raise TypeError(f"unknown inputs {sorted(unknown)}")
+        for name, value in inputs.items():
+            setattr(self, name, value)
+        with stage("build_axes"):
+            if {"time_to_exp_days", "time_steps"}.intersection(inputs):
+                self._build_time_list()
+            if {"current_underlying_price", "price_range_to_display", "price_steps"}.intersection(inputs):
+                self._build_price_range()
+
+    def _synced_grid(self) -> IncrementalGrid:
+        # the grid keeps intermediate terms between evaluations; inputs are re-checked
+        # every time so directly assigned attributes are picked up too
+        if self._grid is None:
+            self._grid = IncrementalGrid(self.price_range_display, self.time_list_display,
+                                         self.strike_price, self.risk_free_rate, self.volatility)
+        else:
+            self._grid.update(self.price_range_display, self.time_list_display,
+                              self.strike_price, self.risk_free_rate, self.volatility)
+        return self._grid
+
+    def evaluate_grid(self, outputs: Iterable[str] = OUTPUTS) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Computes the value and Greeks of the call and put option over the whole
+        price_range_display x time_list_display grid in a single pass.
+        The arrays are kept for later evaluations; copy them before modifying.
+
+        Args:
+            outputs: which of "Value", "Delta", "Gamma", "Vega", "Theta" and "Rho" to compute, all by default
+
+        Returns:
+            Dict[str, Tuple[np.ndarray, np.ndarray]]: call and put arrays keyed by output
+        """
+        if self.engine is not None and not self.engine.closed_form:
+            return self._evaluate_engine_grid(tuple(outputs))
+        with stage("evaluate_grid"):
+            # partial row updates happen while syncing, count them too
+            terms_computed = 0 if self._grid is None else sum(self._grid.computed.values())
+            grid = self._synced_grid()
+            results = grid.evaluate(outputs)
+        count("terms_computed", sum(grid.computed.values()) - terms_computed)
+        count("grid_cells", len(self.price_range_display)*len(self.time_list_display)*len(results))
+        return results
+
+    def _evaluate_engine_grid(self, outputs: Tuple[str, ...]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        # numerical engines have no intermediate terms to share, keep the outputs of the last inputs instead
+        inputs = (self.engine, tuple(self.price_range_display), tuple(self.time_list_display),
+                  self.strike_price, self.risk_free_rate, self.volatility)
+        key, results = self._engine_grid
+        if key != inputs:
+            results = {}
+            self._engine_grid = (inputs, results)
+        missing = [output for output in outputs if output not in results]
+        if missing:
+            with stage(f"evaluate_grid[{type(self.engine).__name__}]"):
+                results.update(self.engine.evaluate_grid(self.price_range_display, self.time_list_display, self.strike_price,
+                                                         self.risk_free_rate, self.volatility, missing))
+            count("grid_cells", len(self.price_range_display)*len(self.time_list_display)*len(missing))
+        return {output: results[output] for output in outputs}
+
+    def write_grid(self, path: str, format: str = "npy", dtype=np.float32):
+        """Writes the value and Greek grids to disk without building them in memory first
+
+        Args:
+            path (str): directory for "npy", file path for "arrow" and "parquet"
+            format (str): "npy" (one memory-mapped .npy per column), "arrow" (Arrow IPC) or "parquet"
+            dtype: float dtype of the stored values
+
+        Returns:
+            Dict[str, np.memmap] | str: the memory-mapped columns for "npy", otherwise path
+        """
+        writers = {"npy": write_grid_npy, "arrow": write_grid_arrow, "parquet": write_grid_parquet}
+        if format not in writers:
+            raise ValueError(f"format must be one of {tuple(writers)}, got {format!r}")
+        return writers[format](path, self.price_range_display, self.time_list_display,
+                               self.strike_price, self.risk_free_rate, self.volatility, dtype=dtype, engine=self.engine)
+
     def calculate_price(self) -> Tuple[List[List[int]], List[List[int]]]:
         """Calculates value of European call and put option
         using the BlackScholes formula
@@ -34,105 +156,35 @@ class BlackScholes:
         Returns:
             Tuple[List[List[int]], List[List[int]]]: values of the call and put option respectively over a given range of time to expiry and underlying prices
         """
-        call_prices = []
-        put_prices = []
-        #print(self.price_range_display)
-        for underlying_price in self.price_range_display:
-            call_row = []
-            put_row = []
-            for dte in self.time_list_display:
-                d1 = (1/(self.volatility * np.sqrt(dte/365)))*(np.log(underlying_price/self.strike_price) +
-                                                               (self.risk_free_rate+(self.volatility*self.volatility)/2)*(dte/365))
-                d2 = d1 - self.volatility*np.sqrt(dte/365)
-                # Call
-                call_price = norm.cdf(d1,0,1)*underlying_price - norm.cdf(d2,0,1)*self.strike_price*np.exp(-1*self.risk_free_rate*(dte/365))
-                call_row.append(round(call_price,3))
-                # Put
-                put_price = norm.cdf(-d2,0,1)*self.strike_price*np.exp(-self.risk_free_rate*dte/365) - norm.cdf(-d1,0,1)*underlying_price
-                put_row.append(round(put_price,3))
-            call_prices.append(call_row)
-            put_prices.append(put_row)
-        return (call_prices, put_prices)
+        with stage("calculate_price"):
+            call_prices, put_prices = self.evaluate_grid(("Value",))["Value"]
+            return (np.round(call_prices, 3).tolist(), np.round(put_prices, 3).tolist())
     
     def calculate_greeks(self, greek:str) -> Tuple[List[List[int]], List[List[int]], List[List[int]], List[List[int]], List[List[int]]]:
-        call_greeks = []
-        put_greeks = []
-        match greek:
-            # Delta
-            case "Delta":
-                for underlying_price in self.price_range_display:
-                    call_row = []
-                    put_row = []
-                    for dte in self.time_list_display:
-                        d1 = (1/(self.volatility * np.sqrt(dte/365)))*(np.log(underlying_price/self.strike_price) +
-                                                                    (self.risk_free_rate+(self.volatility*self.volatility)/2)*(dte/365))
-                        call_row.append(round(norm.cdf(d1),3))
-                        put_row.append(round(-norm.cdf(-d1),3))
-                    call_greeks.append(call_row)
-                    put_greeks.append(put_row)
-            
-            case "Gamma":
-                for underlying_price in self.price_range_display:
-                    call_row = []
-                    put_row = []
-                    for dte in self.time_list_display:
-                        d1 = (1/(self.volatility * np.sqrt(dte/365)))*(np.log(underlying_price/self.strike_price) +
-                                                                    (self.risk_free_rate+(self.volatility*self.volatility)/2)*(dte/365))
-                        call_row.append(round(norm.pdf(d1)/(underlying_price*self.volatility*np.sqrt(dte/365)),3))
-                        put_row.append(round(norm.pdf(d1)/(underlying_price*self.volatility*np.sqrt(dte/365)),3))
-                    call_greeks.append(call_row)
-                    put_greeks.append(put_row)
-            
-            case "Vega":
-                for underlying_price in self.price_range_display:
-                    call_row = []
-                    put_row = []
-                    for dte in self.time_list_display:
-                        d1 = (1/(self.volatility * np.sqrt(dte/365)))*(np.log(underlying_price/self.strike_price) +
-                                                                    (self.risk_free_rate+(self.volatility*self.volatility)/2)*(dte/365))
-                        call_row.append(round(underlying_price*norm.pdf(d1)*np.sqrt(dte/365)*0.01,3)) #want to look at change in vol per 1% change in underlying
-                        put_row.append(round(underlying_price*norm.pdf(d1)*np.sqrt(dte/365)*0.01,3))
-                    call_greeks.append(call_row)
-                    put_greeks.append(put_row)
-            
-            case "Theta":
-                for underlying_price in self.price_range_display:
-                    call_row = []
-                    put_row = []
-                    for dte in self.time_list_display:
-                        d1 = (1/(self.volatility * np.sqrt(dte/365)))*(np.log(underlying_price/self.strike_price) +
-                                                                    (self.risk_free_rate+(self.volatility*self.volatility)/2)*(dte/365))
-                        d2 = d1 - self.volatility*np.sqrt(dte/365)
-                        call_theta = ((-underlying_price*norm.pdf(d1)*self.volatility)/(2*np.sqrt(dte/365)))-self.risk_free_rate*self.strike_price*np.exp(-self.risk_free_rate*(dte/365))*norm.cdf(d2)
-                        put_theta = ((-underlying_price*norm.pdf(d1)*self.volatility)/(2*np.sqrt(dte/365)))+self.risk_free_rate*self.strike_price*np.exp(-self.risk_free_rate*(dte/365))*norm.cdf(-d2)
-                        call_row.append(round(call_theta/365,3)) #look at theta per day, hence divide by 365
-                        put_row.append(round(put_theta/365,3))
-                    call_greeks.append(call_row)
-                    put_greeks.append(put_row)
-            
-            case "Rho":
-                for underlying_price in self.price_range_display:
-                    call_row = []
-                    put_row = []
-                    for dte in self.time_list_display:
-                        d1 = (1/(self.volatility * np.sqrt(dte/365)))*(np.log(underlying_price/self.strike_price) +
-                                                                    (self.risk_free_rate+(self.volatility*self.volatility)/2)*(dte/365))
-                        d2 = d1 - self.volatility*np.sqrt(dte/365)
-                        call_row.append(round(self.strike_price*(dte/365)*np.exp(-self.risk_free_rate*(dte/365))*norm.cdf(d2)*0.01,3)) # look at changes per 1% change, hence multiply 0.01
-                        put_row.append(round(-self.strike_price*(dte/365)*np.exp(-self.risk_free_rate*(dte/365))*norm.cdf(-d2)*0.01,3))
-                    call_greeks.append(call_row)
-                    put_greeks.append(put_row)
-        return call_greeks, put_greeks 
+        if greek not in GREEKS:
+            return [], []
+        with stage("calculate_greeks"):
+            call_greeks, put_greeks = self.evaluate_grid((greek,))[greek]
+            return np.round(call_greeks, 3).tolist(), np.round(put_greeks, 3).tolist()
         
     
     @staticmethod
-    def calculate_pnl(option_projected_val: List[List[int]], amount_paid: float, denomination: str) -> List[List[int]]:
-        pnl = [[0.0 for cols in range(0, len(option_projected_val[0]))] for rows in range(0,len(option_projected_val))]
-        if (denomination == 'P/L $' or denomination == 'P/L %'):
-            for r in range(0, len(option_projected_val)):
-                for c in range(0, len(option_projected_val[0])):
-                    pnl[r][c] = round(option_projected_val[r][c] - amount_paid,3)
-                    if (denomination == 'P/L %'): 
-                        pnl[r][c] = round((pnl[r][c] / amount_paid) * 100,3)
-        return pnl
-     
\ No newline at end of file
+    def calculate_pnl(option_projected_val, amount_paid, denomination: str,
+                      quantity=1, side=LONG, out: Optional[np.ndarray] = None):
+        """Calculates the P/L of a position over a grid of projected option values
+
+        Nested lists are accepted for compatibility and give back nested lists rounded
+        to 3 decimals. Arrays are computed without rounding, optionally into out. See
+        black_scholes.pnl.pnl for multi-leg positions.
+
+        Returns:
+            np.ndarray | List[List[float]]: P/L in $ or % of the premium outlay
+        """
+        if denomination not in PNL_DENOMINATIONS:
+            raise ValueError(f"denomination must be one of {PNL_DENOMINATIONS}, got {denomination!r}")
+        if isinstance(option_projected_val, list):
+            pnl_values = np.round(pnl(option_projected_val, amount_paid, 'P/L $', quantity, side), 3)
+            if denomination == 'P/L %':
+                pnl_values = np.round((pnl_values / premium_outlay(amount_paid, quantity)) * 100, 3)
+            return pnl_values.tolist()
+        return pnl(option_projected_val, amount_paid, denomination, quantity, side, out=out)
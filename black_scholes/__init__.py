@@ -0,0 +1,25 @@
+# Submodules are imported on first attribute access, so `import black_scholes` stays cheap
+# and importing one submodule does not load the others.
+from importlib import import_module
+
+_EXPORTS = {
+    "price_batch": "black_scholes.batch",
+    "implied_volatility": "black_scholes.implied_vol",
+    "BlackScholesEngine": "black_scholes.engines",
+    "BinomialEngine": "black_scholes.engines",
+    "MonteCarloEngine": "black_scholes.engines",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
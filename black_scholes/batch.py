@@ -0,0 +1,90 @@
+from typing import Dict, Optional
+import numpy as np
+from black_scholes.vectorized import GREEKS, evaluate
+
+BATCH_COLUMNS = ("S", "K", "T", "r", "sigma", "kind")
+BATCH_OUTPUTS = ("price",) + tuple(g.lower() for g in GREEKS)
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def is_call(kind) -> np.ndarray:
+    """Parses option kinds into a boolean mask, True for calls.
+
+    Accepts booleans (True for call) or strings starting with "c" or "p" in any
+    case, e.g. "c", "put", "CALL", as a scalar or an array.
+
+    Returns:
+        np.ndarray: boolean mask
+    """
+    kind = np.asarray(kind)
+    if kind.dtype == np.bool_:
+        return kind
+    if kind.dtype.kind != "U":
+        kind = kind.astype(str)
+    # compare first code points directly instead of going through np.char
+    first = np.ascontiguousarray(kind.astype("U1")).view(np.uint32).reshape(kind.shape)
+    calls = (first == ord("c")) | (first == ord("C"))
+    if not np.all(calls | (first == ord("p")) | (first == ord("P"))):
+        raise ValueError("Option kind must be 'c'/'call' or 'p'/'put'")
+    return calls
+
+
+def _columns(table) -> Dict[str, np.ndarray]:
+    # pandas DataFrames, pyarrow Tables, numpy structured arrays and plain
+    # mappings all support lookup by column name
+    return {name: np.asarray(table[name]) for name in BATCH_COLUMNS}
+
+
+def price_batch(S, K=None, T=None, r=None, sigma=None, kind=None,
+                chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE) -> Dict[str, np.ndarray]:
+    """Prices a batch of independent European options with no per-contract Python work.
+
+    Either pass equal-length (or broadcastable) arrays for every argument, or pass a
+    single columnar table (pandas DataFrame, pyarrow Table, numpy structured array or
+    dict of arrays) as S with columns "S", "K", "T", "r", "sigma" and "kind".
+
+    Args:
+        S: spot price of the underlying, or a table holding every column
+        K: strike price
+        T: time to expiry in years
+        r: risk free rate
+        sigma: volatility
+        kind: "c"/"call" or "p"/"put" per contract, or a boolean mask of calls
+        chunk_size (Optional[int]): number of contracts evaluated at once, bounding the memory of intermediates. None evaluates everything at once.
+
+    Returns:
+        Dict[str, np.ndarray]: "price", "delta", "gamma", "vega", "theta" and "rho" per contract,
+        with Vega and Rho per 1% change and Theta per calendar day as in the heatmaps.
+        Contracts with T <= 0 are valued at intrinsic.
+    """
+    if K is None and T is None and r is None and sigma is None and kind is None:
+        columns = _columns(S)
+        S, K, T, r, sigma, kind = (columns[name] for name in BATCH_COLUMNS)
+    if any(arg is None for arg in (K, T, r, sigma, kind)):
+        raise ValueError("price_batch requires S, K, T, r, sigma and kind, or a single table")
+    S, K, T, r, sigma, calls = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (S, K, T, r, sigma)),
+                                                   is_call(kind))
+    shape = S.shape
+    S, K, T, r, sigma, calls = (a.ravel() for a in (S, K, T, r, sigma, calls))
+
+    size = S.shape[0]
+    results = {name: np.empty(size, dtype=np.float64) for name in BATCH_OUTPUTS}
+    step = size if not chunk_size else chunk_size
+    for start in range(0, size, max(step, 1)):
+        chunk = slice(start, start + step)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            grid = evaluate(S[chunk], T[chunk], K[chunk], r[chunk], sigma[chunk])
+        for name, key in zip(BATCH_OUTPUTS, ("Value",) + GREEKS):
+            call_values, put_values = grid[key]
+            results[name][chunk] = np.where(calls[chunk], call_values, put_values)
+
+    # contracts at or past expiry are worth their intrinsic value, delta is the 0/+-1 step and the other Greeks are 0
+    expired = np.flatnonzero(T <= 0)
+    if expired.size:
+        moneyness = S[expired] - K[expired]
+        call = calls[expired]
+        results["price"][expired] = np.where(call, np.maximum(moneyness, 0.0), np.maximum(-moneyness, 0.0))
+        results["delta"][expired] = np.where(call, 1.0*(moneyness > 0), -1.0*(moneyness < 0))
+        for name in BATCH_OUTPUTS[2:]:
+            results[name][expired] = 0.0
+    return {name: values.reshape(shape) for name, values in results.items()}
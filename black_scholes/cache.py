@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable
+import numpy as np
+
+
+def make_key(*inputs) -> tuple:
+    """Builds a hashable cache key from model inputs, normalising numbers so that
+    e.g. 30 and 30.0 share an entry.
+
+    Returns:
+        tuple: the cache key
+    """
+    return tuple(float(i) if isinstance(i, (int, float, np.number)) and not isinstance(i, bool) else i
+                 for i in inputs)
+
+
+def freeze(value):
+    """Marks ndarrays in a cached value as read-only so callers cannot mutate
+    a result shared with other sessions. Dicts, lists and tuples are walked.
+
+    Returns:
+        the same value
+    """
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for v in value.values():
+            freeze(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            freeze(v)
+    return value
+
+
+class LRUCache:
+    """Thread-safe bounded least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 128) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]):
+        """Returns the cached value for key, calling compute and storing its
+        result on a miss. compute runs outside the lock so a slow computation
+        does not block other sessions.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"size": len(self._entries), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": self.hits/lookups if lookups else 0.0}
@@ -0,0 +1,70 @@
+import io
+from typing import Sequence
+import numpy as np
+
+ANNOTATION_CELL_LIMIT = 400 # cells above which heatmap values are shown in tooltips only
+
+
+def grid_frame(values, price_range: Sequence[float], time_list: Sequence[float], value_name: str = "Value"):
+    """Flattens a (spot x days to expiry) grid into a long-form DataFrame with
+    one row per cell, as expected by Altair.
+
+    Returns:
+        pd.DataFrame: columns "Spot Price", "Days to Expiry" and value_name
+    """
+    import pandas as pd
+    values = np.asarray(values, dtype=np.float64)
+    spot = np.round(np.asarray(price_range, dtype=np.float64), 2)
+    days = np.asarray(time_list, dtype=np.float64)
+    return pd.DataFrame({"Spot Price": np.repeat(spot, days.shape[0]),
+                         "Days to Expiry": np.tile(days, spot.shape[0]),
+                         value_name: values.ravel()})
+
+
+def altair_heatmap(values, price_range: Sequence[float], time_list: Sequence[float], title: str):
+    """Builds a heatmap that is rendered client-side by Vega-Lite, so only the raw
+    grid is sent to the browser. Cells are annotated with their values for grids
+    up to ANNOTATION_CELL_LIMIT cells; every cell shows its value in a tooltip.
+
+    Returns:
+        alt.LayerChart: the heatmap
+    """
+    import altair as alt
+    frame = grid_frame(values, price_range, time_list)
+    spot_order = frame["Spot Price"].iloc[::len(time_list)].tolist()
+    days_order = frame["Days to Expiry"].iloc[:len(time_list)].tolist()
+    # st.altair_chart sends the frame to the browser as Arrow, without Altair's 5000 row limit
+    base = alt.Chart(frame, title=title).encode(
+        x=alt.X("Days to Expiry:O", sort=days_order, axis=alt.Axis(labelOverlap=True, labelAngle=0)),
+        y=alt.Y("Spot Price:O", sort=spot_order, axis=alt.Axis(labelOverlap=True)))
+    heatmap = base.mark_rect().encode(
+        color=alt.Color("Value:Q", scale=alt.Scale(scheme="redyellowgreen"), legend=None),
+        tooltip=["Spot Price:O", "Days to Expiry:O", alt.Tooltip("Value:Q", format=".2f")])
+    if frame.shape[0] > ANNOTATION_CELL_LIMIT:
+        return heatmap.properties(height=500)
+    text = base.mark_text(color="black").encode(text=alt.Text("Value:Q", format=".2f"))
+    return (heatmap + text).properties(height=500)
+
+
+def matplotlib_heatmap(values, price_range: Sequence[float], time_list: Sequence[float], title: str) -> bytes:
+    """Draws an annotated seaborn heatmap into a standalone Figure, not registered
+    with pyplot, and returns it as PNG bytes. The figure is cleared once saved.
+
+    Returns:
+        bytes: the rendered PNG
+    """
+    import seaborn as sns
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(10,7))
+    ax = fig.subplots()
+    annotate = np.size(values) <= ANNOTATION_CELL_LIMIT
+    sns.heatmap(values, xticklabels=time_list, yticklabels=np.round(price_range, 2), annot=annotate, fmt=".2f", cmap="RdYlGn", ax=ax, cbar=False)
+    ax.set_title(title)
+    ax.set_xlabel('Days to Expiry')
+    ax.set_ylabel('Spot Price')
+    ax.tick_params(axis='y', rotation=0)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+    fig.clear()
+    return buffer.getvalue()
@@ -0,0 +1,273 @@
+"""Pluggable pricing engines for the value and Greek grids.
+
+An engine values calls and puts over broadcasting arrays of spot, time to expiry
+in years, strike, rate and volatility. BlackScholes(engine=...) evaluates its grids
+with it. The Greeks of numerical engines are computed by bumping and repricing,
+with the conventions of the closed form: Vega and Rho per 1% change, Theta per
+calendar day.
+"""
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import numpy as np
+from black_scholes.vectorized import OUTPUTS, evaluate, option_values
+
+DEFAULT_CHUNK_CELLS = 1 << 20 # lattice nodes or simulated steps per chunk, bounds the memory of each chunk
+EXECUTORS = ("thread", "process")
+MIN_CHUNK_DRAWS = 1024 # Monte Carlo chunks take fewer contracts rather than fewer draws below this
+VOLATILITY_BUMP = 0.01
+RATE_BUMP = 0.01
+DAY = 1/365
+
+
+class PricingEngine(ABC):
+    """Base class of the engines. Subclasses implement option_values."""
+    closed_form = False
+    exercise = "european"
+    spot_bump = 0.01 # relative spot bump of Delta and Gamma
+
+    @abstractmethod
+    def option_values(self, spot, time_to_exp_years, strike, risk_free_rate, volatility) -> Tuple[np.ndarray, np.ndarray]:
+        """Values call and put options; every argument broadcasts against the others
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: call and put values respectively
+        """
+
+    def evaluate(self, spot, time_to_exp_years, strike, risk_free_rate, volatility,
+                 outputs: Iterable[str] = OUTPUTS) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Computes the value and Greeks by central differences, or a one day forward
+        difference for Theta. Each bump is one more call to option_values.
+
+        Returns:
+            Dict[str, Tuple[np.ndarray, np.ndarray]]: call and put arrays keyed by output, like vectorized.evaluate
+        """
+        outputs = tuple(outputs)
+        unknown = set(outputs) - set(OUTPUTS)
+        if unknown:
+            raise ValueError(f"unknown outputs {sorted(unknown)}")
+        spot, t, strike, rate, volatility = np.broadcast_arrays(
+            *(np.asarray(a, dtype=np.float64) for a in (spot, time_to_exp_years, strike, risk_free_rate, volatility)))
+        price = lambda spot=spot, t=t, rate=rate, volatility=volatility: np.asarray(
+            self.option_values(spot, t, strike, rate, volatility))
+        values = price()
+        results = {"Value": values}
+        if "Delta" in outputs or "Gamma" in outputs:
+            h = self.spot_bump*spot
+            up, down = price(spot=spot + h), price(spot=spot - h)
+            results["Delta"] = (up - down)/(2*h)
+            results["Gamma"] = (up - 2*values + down)/(h*h)
+        if "Vega" in outputs:
+            high, low = volatility + VOLATILITY_BUMP, np.maximum(volatility - VOLATILITY_BUMP, volatility/2)
+            results["Vega"] = (price(volatility=high) - price(volatility=low))/(high - low)*0.01
+        if "Theta" in outputs:
+            results["Theta"] = price(t=np.maximum(t - DAY, 0.0)) - values
+        if "Rho" in outputs:
+            results["Rho"] = (price(rate=rate + RATE_BUMP) - price(rate=rate - RATE_BUMP))/2
+        return {output: (results[output][0], results[output][1]) for output in outputs}
+
+    def evaluate_grid(self, price_range, time_list_days, strike, risk_free_rate, volatility,
+                      outputs: Iterable[str] = OUTPUTS) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Evaluates every spot price in price_range against every day count in time_list_days
+
+        Returns:
+            Dict[str, Tuple[np.ndarray, np.ndarray]]: arrays of shape (len(price_range), len(time_list_days))
+        """
+        spot = np.asarray(price_range, dtype=np.float64)[:, np.newaxis]
+        t = np.asarray(time_list_days, dtype=np.float64)[np.newaxis, :]/365
+        return self.evaluate(spot, t, strike, risk_free_rate, volatility, outputs)
+
+
+def _flatten(spot, time_to_exp_years, strike, risk_free_rate, volatility) -> Tuple[Tuple[int, ...], Tuple[np.ndarray, ...]]:
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64)
+                                   for a in (spot, time_to_exp_years, strike, risk_free_rate, volatility)))
+    return arrays[0].shape, tuple(a.ravel() for a in arrays)
+
+
+class BlackScholesEngine(PricingEngine):
+    """The closed form, with analytic Greeks"""
+    closed_form = True
+
+    def option_values(self, spot, time_to_exp_years, strike, risk_free_rate, volatility) -> Tuple[np.ndarray, np.ndarray]:
+        return option_values(spot, time_to_exp_years, strike, risk_free_rate, volatility)
+
+    def evaluate(self, spot, time_to_exp_years, strike, risk_free_rate, volatility,
+                 outputs: Iterable[str] = OUTPUTS) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        return evaluate(spot, time_to_exp_years, strike, risk_free_rate, volatility, outputs)
+
+
+class BinomialEngine(PricingEngine):
+    """Cox-Ross-Rubinstein lattice, American exercise by default.
+
+    All contracts of a chunk step back through their lattices together, so each of
+    the steps backward-induction steps is a handful of array operations.
+    """
+    # wider than the node spacing, whose odd/even oscillation otherwise dominates Gamma
+    spot_bump = 0.05
+
+    def __init__(self, steps: int = 500, american: bool = True, chunk_cells: int = DEFAULT_CHUNK_CELLS) -> None:
+        self.steps = steps
+        self.american = american
+        self.exercise = "american" if american else "european"
+        self.chunk_cells = chunk_cells
+
+    def option_values(self, spot, time_to_exp_years, strike, risk_free_rate, volatility) -> Tuple[np.ndarray, np.ndarray]:
+        shape, (S, T, K, r, sigma) = _flatten(spot, time_to_exp_years, strike, risk_free_rate, volatility)
+        # expired contracts are worth their intrinsic value
+        call_values, put_values = np.maximum(S - K, 0.0), np.maximum(K - S, 0.0)
+        live = np.flatnonzero(T > 0)
+        step = max(1, self.chunk_cells//(self.steps + 1))
+        for start in range(0, live.size, step):
+            chunk = live[start:start + step]
+            call_values[chunk], put_values[chunk] = self._lattice(S[chunk], T[chunk], K[chunk], r[chunk], sigma[chunk])
+        return call_values.reshape(shape), put_values.reshape(shape)
+
+    def _lattice(self, S, T, K, r, sigma) -> Tuple[np.ndarray, np.ndarray]:
+        dt = (T/self.steps)[:, np.newaxis]
+        up = np.exp(sigma[:, np.newaxis]*np.sqrt(dt))
+        down = 1/up
+        growth = np.exp(r[:, np.newaxis]*dt)
+        p_up = (growth - down)/(up - down)
+        p_down = 1 - p_up
+        K = K[:, np.newaxis]
+        # node j of step i is at S*up**(i - 2j)
+        spot = S[:, np.newaxis]*up**(self.steps - 2*np.arange(self.steps + 1))
+        call_values, put_values = np.maximum(spot - K, 0.0), np.maximum(K - spot, 0.0)
+        for _ in range(self.steps):
+            spot = spot[:, :-1]*down
+            call_values = (p_up*call_values[:, :-1] + p_down*call_values[:, 1:])/growth
+            put_values = (p_up*put_values[:, :-1] + p_down*put_values[:, 1:])/growth
+            if self.american:
+                np.maximum(call_values, spot - K, out=call_values)
+                np.maximum(put_values, K - spot, out=put_values)
+        return call_values[:, 0], put_values[:, 0]
+
+
+def european_payoff(paths: np.ndarray, strike: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Payoff of European options on the last price of each path"""
+    final = paths[..., -1]
+    return np.maximum(final - strike, 0.0), np.maximum(strike - final, 0.0)
+
+
+def asian_payoff(paths: np.ndarray, strike: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Payoff of arithmetic average price options, averaging the simulated steps of each path"""
+    average = paths.mean(axis=-1)
+    return np.maximum(average - strike, 0.0), np.maximum(strike - average, 0.0)
+
+
+def _simulate_chunk(seed: np.random.SeedSequence, draws: int, S, T, K, r, sigma, steps: int, antithetic: bool,
+                    payoff: Callable) -> np.ndarray:
+    # sums of the discounted call and put payoffs Y and of the control X = exp(-rT)*S_T, per contract:
+    # [call/put, (Y, Y*Y, X, X*X, X*Y), contract]
+    z = np.random.default_rng(seed).standard_normal((S.shape[0], draws, steps))
+    dt = (T/steps)[:, np.newaxis, np.newaxis]
+    drift = (r[:, np.newaxis, np.newaxis] - sigma[:, np.newaxis, np.newaxis]**2/2)*dt
+    diffusion = sigma[:, np.newaxis, np.newaxis]*np.sqrt(dt)
+    discount = np.exp(-r*T)[:, np.newaxis]
+    strike = K[:, np.newaxis]
+
+    def discounted(z):
+        paths = S[:, np.newaxis, np.newaxis]*np.exp(np.cumsum(drift + diffusion*z, axis=2))
+        call_payoff, put_payoff = payoff(paths, strike)
+        return discount*call_payoff, discount*put_payoff, discount*paths[..., -1]
+
+    call_payoff, put_payoff, control = discounted(z)
+    if antithetic:
+        # average each antithetic pair first so that the pairs are independent samples
+        antithetic_call, antithetic_put, antithetic_control = discounted(-z)
+        call_payoff = (call_payoff + antithetic_call)/2
+        put_payoff = (put_payoff + antithetic_put)/2
+        control = (control + antithetic_control)/2
+    return np.stack([np.stack([y.sum(axis=1), (y*y).sum(axis=1), control.sum(axis=1), (control*control).sum(axis=1),
+                               (control*y).sum(axis=1)]) for y in (call_payoff, put_payoff)])
+
+
+class MonteCarloEngine(PricingEngine):
+    """Monte Carlo under geometric Brownian motion with antithetic and control variates.
+
+    Paths are simulated in chunks of at most chunk_cells steps, each covering a block
+    of contracts and a block of draws with its own stream spawned from seed, so
+    results depend on the seed but not on workers or executor. Only per-contract sums
+    leave a chunk, so memory is bounded by the chunk size whatever the number of
+    contracts, steps and paths.
+
+    The control variate is the discounted final price, whose expectation is the spot
+    price; it applies to any payoff of the simulated paths.
+    """
+
+    def __init__(self, paths: int = 100_000, steps: int = 1, seed: int = 0, antithetic: bool = True,
+                 control_variate: bool = True, payoff: Callable = european_payoff,
+                 chunk_cells: int = DEFAULT_CHUNK_CELLS, workers: Optional[int] = None, executor: str = "thread") -> None:
+        """
+        Args:
+            paths (int): simulated paths per contract, counting both paths of an antithetic pair
+            steps (int): time steps per path; 1 is exact for European payoffs
+            payoff (Callable): maps paths of shape (contracts, draws, steps) and strikes of shape (contracts, 1)
+                to call and put payoffs of shape (contracts, draws). Must be a module level function for "process".
+            workers (Optional[int]): pool size, defaults to the number of CPUs
+            executor (str): "thread" or "process"
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {executor!r}")
+        self.paths = paths
+        self.steps = steps
+        self.seed = seed
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.payoff = payoff
+        self.chunk_cells = chunk_cells
+        self.workers = workers
+        self.executor = executor
+
+    def option_values(self, spot, time_to_exp_years, strike, risk_free_rate, volatility) -> Tuple[np.ndarray, np.ndarray]:
+        call_values, put_values, _, _ = self.simulate(spot, time_to_exp_years, strike, risk_free_rate, volatility)
+        return call_values, put_values
+
+    def simulate(self, spot, time_to_exp_years, strike, risk_free_rate,
+                 volatility) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Prices like option_values, also estimating the standard error of each price
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: call values, put values and their standard errors
+        """
+        shape, (S, T, K, r, sigma) = _flatten(spot, time_to_exp_years, strike, risk_free_rate, volatility)
+        call_values, put_values = np.maximum(S - K, 0.0), np.maximum(K - S, 0.0)
+        call_errors, put_errors = np.zeros_like(call_values), np.zeros_like(put_values)
+        live = T > 0
+        if live.any():
+            # chunks cover blocks of contracts x blocks of draws with at most chunk_cells simulated steps.
+            # Expired contracts are simulated too, over no time, so the blocks and therefore the random
+            # numbers of each contract do not change when bumped repricings move contracts past expiry.
+            size = S.shape[0]
+            draws = self.paths//2 if self.antithetic else self.paths
+            contracts = max(1, min(size, self.chunk_cells//(min(draws, MIN_CHUNK_DRAWS)*self.steps)))
+            chunk_draws = max(1, min(draws, self.chunk_cells//(contracts*self.steps)))
+            chunks = [(slice(start, start + contracts), min(chunk_draws, draws - first))
+                      for start in range(0, size, contracts) for first in range(0, draws, chunk_draws)]
+            seeds = np.random.SeedSequence(self.seed).spawn(len(chunks))
+            T = np.maximum(T, 0.0)
+            sums = np.zeros((2, 5, size))
+            # imported here, multiprocessing alone adds ~40 ms to importing the package
+            from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+            pool = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+            with pool(max_workers=self.workers or os.cpu_count() or 1) as executor:
+                futures = [(block, executor.submit(_simulate_chunk, seed, chunk_size, S[block], T[block], K[block], r[block],
+                                                   sigma[block], self.steps, self.antithetic, self.payoff))
+                           for (block, chunk_size), seed in zip(chunks, seeds)]
+                for block, future in futures:
+                    sums[:, :, block] += future.result()
+            estimates, errors = self._estimate(sums[:, :, live]/draws, S[live], draws)
+            (call_values[live], put_values[live]), (call_errors[live], put_errors[live]) = estimates, errors
+        return tuple(a.reshape(shape) for a in (call_values, put_values, call_errors, put_errors))
+
+    def _estimate(self, moments: np.ndarray, S: np.ndarray, draws: int) -> Tuple[np.ndarray, np.ndarray]:
+        mean_y, mean_yy, mean_x, mean_xx, mean_xy = np.moveaxis(moments, 1, 0)
+        variance = np.maximum(mean_yy - mean_y*mean_y, 0.0)
+        if self.control_variate:
+            variance_x = mean_xx - mean_x*mean_x
+            covariance = mean_xy - mean_x*mean_y
+            with np.errstate(divide="ignore", invalid="ignore"):
+                beta = np.where(variance_x > 0, covariance/variance_x, 0.0)
+            mean_y = mean_y - beta*(mean_x - S)
+            variance = np.maximum(variance - beta*covariance, 0.0)
+        return mean_y, np.sqrt(variance/max(draws - 1, 1))
@@ -0,0 +1,118 @@
+from typing import Tuple
+import numpy as np
+from black_scholes.batch import is_call
+from black_scholes.special import norm_cdf, norm_pdf
+from black_scholes.vectorized import d1_d2
+
+# Per-contract convergence status returned by implied_volatility
+CONVERGED = 0 # Halley iterations converged
+BRACKETED = 1 # converged by the bisection fallback
+OUT_OF_BOUNDS = -1 # price below intrinsic value or above the no-arbitrage upper bound
+NOT_CONVERGED = -2 # no iteration met the tolerance
+
+MIN_VOLATILITY = 1e-8
+MAX_VOLATILITY = 100.0
+
+
+def _value_vega(S, K, T, r, sigma, calls) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    d1, d2 = d1_d2(S, T, K, r, sigma)
+    discounted_strike = K*np.exp(-r*T)
+    call_value = norm_cdf(d1)*S - norm_cdf(d2)*discounted_strike
+    put_value = norm_cdf(-d2)*discounted_strike - norm_cdf(-d1)*S
+    vega = S*norm_pdf(d1)*np.sqrt(T)
+    return np.where(calls, call_value, put_value), vega, d1, d2
+
+
+def initial_guess(price, S, K, T, r, calls) -> np.ndarray:
+    """Seeds the solver with the Corrado-Miller rational approximation,
+    falling back to the Manaster-Koehler guess where it breaks down.
+
+    Returns:
+        np.ndarray: starting volatilities
+    """
+    discounted_strike = K*np.exp(-r*T)
+    # put-call parity, the approximation is stated for calls
+    call_price = np.where(calls, price, price + S - discounted_strike)
+    half_moneyness = (S - discounted_strike)/2
+    excess = call_price - half_moneyness
+    root = np.sqrt(np.maximum(excess*excess - (S - discounted_strike)**2/np.pi, 0.0))
+    guess = np.sqrt(2*np.pi/T)/(S + discounted_strike)*(excess + root)
+    manaster_koehler = np.sqrt(2*np.abs(np.log(S/K) + r*T)/T)
+    guess = np.where(np.isfinite(guess) & (guess > 0), guess, manaster_koehler)
+    return np.clip(guess, 1e-3, 5.0)
+
+
+def implied_volatility(price, S, K, T, r, kind, tol: float = 1e-10,
+                       max_iter: int = 20, bisection_iter: int = 200) -> Tuple[np.ndarray, np.ndarray]:
+    """Solves for the Black-Scholes volatility implied by market prices, for whole
+    arrays of contracts at once.
+
+    Each contract starts from a rational approximation and takes vectorized Halley
+    steps. Contracts where Halley stalls, typically deep ITM/OTM options with
+    vanishing vega, fall back to bisection on a bracket that always contains the root.
+
+    Args:
+        price: market price of the option
+        S: spot price of the underlying
+        K: strike price
+        T: time to expiry in years
+        r: risk free rate
+        kind: "c"/"call" or "p"/"put" per contract, or a boolean mask of calls
+        tol (float): absolute tolerance on the volatility
+        max_iter (int): maximum number of Halley steps
+        bisection_iter (int): maximum number of bisection steps for the fallback
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: implied volatilities (nan where unsolved) and the status of each contract,
+        one of CONVERGED, BRACKETED, OUT_OF_BOUNDS or NOT_CONVERGED
+    """
+    price, S, K, T, r, calls = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (price, S, K, T, r)),
+                                                   is_call(kind))
+    shape = price.shape
+    price, S, K, T, r, calls = (a.ravel() for a in (price, S, K, T, r, calls))
+
+    discounted_strike = K*np.exp(-r*T)
+    lower = np.where(calls, np.maximum(S - discounted_strike, 0.0), np.maximum(discounted_strike - S, 0.0))
+    upper = np.where(calls, S, discounted_strike)
+    status = np.full(price.shape, NOT_CONVERGED, dtype=np.int8)
+    status[~((price > lower) & (price < upper) & (T > 0))] = OUT_OF_BOUNDS
+    sigma = np.full(price.shape, np.nan)
+
+    # Halley iterations on the contracts still being solved
+    active = np.flatnonzero(status == NOT_CONVERGED)
+    guess = initial_guess(price[active], S[active], K[active], T[active], r[active], calls[active])
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            value, vega, d1, d2 = _value_vega(S[active], K[active], T[active], r[active], guess, calls[active])
+            diff = value - price[active]
+            volga = vega*d1*d2/guess
+            step = diff/vega
+            step = step/(1 - 0.5*step*volga/vega)
+            next_guess = guess - step
+            valid = np.isfinite(next_guess) & (next_guess > 0)
+            done = valid & (np.abs(step) <= tol)
+            sigma[active[done]] = next_guess[done]
+            status[active[done]] = CONVERGED
+            keep = valid & ~done
+            active, guess = active[keep], next_guess[keep]
+
+    # bisection fallback, value is monotonically increasing in volatility
+    pending = np.flatnonzero(status == NOT_CONVERGED)
+    if pending.size:
+        low = np.full(pending.shape, MIN_VOLATILITY)
+        high = np.full(pending.shape, MAX_VOLATILITY)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for _ in range(bisection_iter):
+                mid = 0.5*(low + high)
+                value = _value_vega(S[pending], K[pending], T[pending], r[pending], mid, calls[pending])[0]
+                too_high = value > price[pending]
+                high = np.where(too_high, mid, high)
+                low = np.where(too_high, low, mid)
+                if np.all(high - low <= tol):
+                    break
+        converged = high - low <= tol
+        sigma[pending[converged]] = 0.5*(low + high)[converged]
+        status[pending[converged]] = BRACKETED
+    return sigma.reshape(shape), status.reshape(shape)
@@ -0,0 +1,84 @@
+from collections import Counter
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+import numpy as np
+from black_scholes.vectorized import OUTPUTS, dependents, resolve
+
+
+class IncrementalGrid:
+    """Keeps every intermediate term of a (spot x days to expiry) grid, such as
+    sqrt(T), the discount factor, log-moneyness, d1/d2 and N(d1)/N(d2), and on
+    each update recomputes only the terms that depend on the inputs that changed.
+
+    When only the spot prices change, rows whose spot price was already on the
+    grid are copied over and only the new rows are computed. Rows are matched on
+    their exact spot price: BlackScholes' default axis spaces its 19 rows by a whole
+    percentage that grows with the range, so widening it there moves nearly every
+    row. Pass price_range values on a fixed spacing to benefit.
+    """
+
+    def __init__(self, price_range: Sequence[float], time_list_days: Sequence[float],
+                 strike: float, risk_free_rate: float, volatility: float) -> None:
+        self._terms = {}
+        self.computed = Counter() # term name -> number of times it was (re)computed, for all or some rows
+        self.computed_rows = 0 # spot rows computed by partial updates
+        self.update(price_range, time_list_days, strike, risk_free_rate, volatility)
+
+    def update(self, price_range: Optional[Sequence[float]] = None, time_list_days: Optional[Sequence[float]] = None,
+               strike: Optional[float] = None, risk_free_rate: Optional[float] = None,
+               volatility: Optional[float] = None) -> Set[str]:
+        """Sets new inputs, leaving those passed as None unchanged
+
+        Returns:
+            Set[str]: the inputs that actually changed
+        """
+        new = {}
+        if price_range is not None:
+            new["spot"] = np.asarray(price_range, dtype=np.float64)[:, np.newaxis]
+        if time_list_days is not None:
+            new["t"] = np.asarray(time_list_days, dtype=np.float64)[np.newaxis, :]/365
+        for name, value in (("strike", strike), ("rate", risk_free_rate), ("volatility", volatility)):
+            if value is not None:
+                new[name] = float(value)
+        changed = {name for name, value in new.items()
+                   if name not in self._terms or not np.array_equal(self._terms[name], value)}
+        if not changed:
+            return changed
+        stale = dependents(changed)
+        if changed == {"spot"} and "spot" in self._terms:
+            self._update_rows(new["spot"], stale)
+        else:
+            for name in stale:
+                self._terms.pop(name, None)
+            self._terms.update((name, new[name]) for name in changed)
+        return changed
+
+    def _update_rows(self, spot: np.ndarray, stale: Set[str]) -> None:
+        # reuse the rows of every cached spot dependent term whose spot price is unchanged
+        rows = {value: i for i, value in enumerate(self._terms["spot"][:, 0])}
+        old_rows = np.array([rows.get(value, -1) for value in spot[:, 0]], dtype=np.int64)
+        found = old_rows >= 0
+        missing = ~found
+        cached = {name: self._terms.pop(name) for name in stale if name in self._terms}
+        self._terms["spot"] = spot
+        if missing.any():
+            partial = {name: value for name, value in self._terms.items() if name not in stale}
+            partial["spot"] = spot[missing]
+            resolve(cached, partial, on_compute=lambda name: self.computed.update((name,)))
+            self.computed_rows += int(missing.sum())
+        for name, values in cached.items():
+            rows_values = np.empty((spot.shape[0],) + values.shape[1:], dtype=values.dtype)
+            rows_values[found] = values[old_rows[found]]
+            if missing.any():
+                rows_values[missing] = partial[name]
+            self._terms[name] = rows_values
+
+    def evaluate(self, outputs: Iterable[str] = OUTPUTS) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Computes the requested outputs, reusing every cached term
+
+        Returns:
+            Dict[str, Tuple[np.ndarray, np.ndarray]]: call and put arrays keyed by "Value" and each Greek
+        """
+        outputs = tuple(outputs)
+        resolve((name for output in outputs for name in OUTPUTS[output]), self._terms,
+                on_compute=lambda name: self.computed.update((name,)))
+        return {output: (self._terms[OUTPUTS[output][0]], self._terms[OUTPUTS[output][1]]) for output in outputs}
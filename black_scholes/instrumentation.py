@@ -0,0 +1,165 @@
+"""Opt-in stage timers, counters and profiling for the pricing pipeline.
+
+Instrumentation is off by default, and stage() and count() then do nothing but check
+a flag. Turn it on with enable() or by setting BLACK_SCHOLES_INSTRUMENT=1, then read
+the per-stage latencies with snapshot(), export_json() or prometheus_text().
+
+    with stage("evaluate_grid"):
+        ...
+    count("grid_cells", rows*columns)
+"""
+import io
+import json
+import os
+import time
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from threading import Lock
+from typing import Dict, Iterator, Optional
+import numpy as np
+
+_NULL_STAGE = nullcontext()
+
+
+class Recorder:
+    """Thread-safe store of stage latencies, over the most recent window calls of each stage, and counters"""
+
+    def __init__(self, window: int = 4096) -> None:
+        self.window = window
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latencies = {}
+            self._calls = Counter()
+            self._total = Counter()
+            self.counters = Counter()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(name, deque(maxlen=self.window)).append(seconds)
+            self._calls[name] += 1
+            self._total[name] += seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Returns:
+            Dict[str, Dict]: "stages", mapping each stage to its call count and latencies in ms, and "counters"
+        """
+        with self._lock:
+            latencies = {name: np.asarray(values) for name, values in self._latencies.items()}
+            calls, total, counters = dict(self._calls), dict(self._total), dict(self.counters)
+        stages = {name: {"calls": calls[name], "total_ms": total[name]*1e3, "mean_ms": float(values.mean()*1e3),
+                         "p50_ms": float(np.percentile(values, 50)*1e3), "p95_ms": float(np.percentile(values, 95)*1e3),
+                         "max_ms": float(values.max()*1e3)}
+                  for name, values in latencies.items()}
+        return {"stages": stages, "counters": counters}
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        RECORDER.record(self.name, time.perf_counter() - self.start)
+
+
+RECORDER = Recorder()
+_enabled = os.environ.get("BLACK_SCHOLES_INSTRUMENT", "") not in ("", "0")
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def stage(name: str):
+    """Context manager timing the enclosed block as stage name, when instrumentation is enabled"""
+    return _Stage(name) if _enabled else _NULL_STAGE
+
+
+def count(name: str, n: int = 1) -> None:
+    """Adds n to counter name, when instrumentation is enabled"""
+    if _enabled:
+        RECORDER.count(name, n)
+
+
+def snapshot() -> Dict[str, Dict]:
+    return RECORDER.snapshot()
+
+
+def reset() -> None:
+    RECORDER.reset()
+
+
+def export_json(path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def prometheus_text(prefix: str = "black_scholes") -> str:
+    """Formats the snapshot in the Prometheus text exposition format
+
+    Returns:
+        str: stage call counts, total seconds and latency quantiles, and every counter
+    """
+    metrics = snapshot()
+    lines = [f"# TYPE {prefix}_stage_seconds summary"]
+    for name, stats in metrics["stages"].items():
+        for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms")):
+            lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{quantile}"}} {stats[key]/1e3:.9g}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats["total_ms"]/1e3:.9g}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats["calls"]}')
+    lines.append(f"# TYPE {prefix}_total counter")
+    lines.extend(f'{prefix}_total{{counter="{name}"}} {value}' for name, value in metrics["counters"].items())
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profile(path: Optional[str] = None) -> Iterator["cProfile.Profile"]:
+    """Runs cProfile over the enclosed block, whether or not instrumentation is enabled
+
+    Args:
+        path (Optional[str]): file to dump the stats to, readable with pstats or snakeviz
+
+    Yields:
+        cProfile.Profile: the profiler, pass it to profile_report after the block
+    """
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path is not None:
+            profiler.dump_stats(path)
+
+
+def profile_report(profiler: "cProfile.Profile", limit: int = 25, sort: str = "cumulative") -> str:
+    """Returns:
+        str: the limit most expensive functions of a finished profile
+    """
+    import pstats
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
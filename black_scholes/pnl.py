@@ -0,0 +1,82 @@
+from typing import Iterable, Iterator, Optional
+import numpy as np
+from black_scholes.instrumentation import count, stage
+
+PNL_DENOMINATIONS = ('P/L $', 'P/L %')
+LONG = 1
+SHORT = -1
+
+
+def premium_outlay(premium, quantity=1) -> float:
+    """Total premium paid (or received) across legs, the base of P/L %"""
+    return float(np.sum(np.asarray(quantity, dtype=np.float64)*np.asarray(premium, dtype=np.float64)))
+
+
+def pnl(values, premium, denomination: str, quantity=1, side=LONG,
+        out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Computes the P/L of a position over a grid of projected option values.
+
+    For a single leg, values is any array of projected values and premium, quantity
+    and side are scalars. For a multi-leg position, premium, quantity and side are
+    1-D with one entry per leg, values has the legs along its first axis, and the
+    legs are aggregated into a single grid.
+
+    P/L $ is sum(side * quantity * (value - premium)) and P/L % is P/L $ relative to
+    the premium outlay sum(quantity * premium).
+
+    Args:
+        values: projected option values
+        premium: premium paid per contract, per leg
+        denomination (str): 'P/L $' or 'P/L %'
+        quantity: number of contracts, per leg
+        side: LONG (1) or SHORT (-1), per leg
+        out (Optional[np.ndarray]): float64 buffer to write the result into
+
+    Returns:
+        np.ndarray: the P/L grid, out when given
+    """
+    if denomination not in PNL_DENOMINATIONS:
+        raise ValueError(f"denomination must be one of {PNL_DENOMINATIONS}, got {denomination!r}")
+    with stage("pnl"):
+        out = _pnl(values, premium, denomination, quantity, side, out)
+    count("pnl_cells", out.size)
+    return out
+
+
+def _pnl(values, premium, denomination, quantity, side, out) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    premium, quantity, side = (np.asarray(a, dtype=np.float64) for a in (premium, quantity, side))
+    if max(premium.ndim, quantity.ndim, side.ndim) > 0:
+        premium, quantity, side = np.broadcast_arrays(premium, quantity, side)
+        if values.shape[:1] != premium.shape:
+            raise ValueError(f"values has {values.shape[:1]} legs, expected {premium.shape}")
+        weights = side*quantity
+        out = np.einsum('l,l...->...', weights, values, out=out)
+        out -= np.dot(weights, premium)
+    else:
+        out = np.subtract(values, premium, out=out)
+        if side*quantity != 1:
+            out *= side*quantity
+    if denomination == 'P/L %':
+        out /= premium_outlay(premium, quantity)
+        out *= 100
+    return out
+
+
+def iter_pnl(value_chunks: Iterable, premium, denomination: str, quantity=1, side=LONG) -> Iterator[np.ndarray]:
+    """Streams P/L over chunks of a scenario grid, e.g. blocks of rows from a
+    memory-mapped value grid, reusing a single output buffer.
+
+    Each yielded array is overwritten by the next chunk; copy it to keep it.
+
+    Yields:
+        np.ndarray: the P/L of each chunk
+    """
+    multi_leg = max(np.ndim(premium), np.ndim(quantity), np.ndim(side)) > 0
+    buffer = None
+    for values in value_chunks:
+        values = np.asarray(values, dtype=np.float64)
+        shape = values.shape[1:] if multi_leg else values.shape
+        if buffer is None or buffer.shape[1:] != shape[1:] or buffer.shape[0] < shape[0]:
+            buffer = np.empty(shape, dtype=np.float64)
+        yield pnl(values, premium, denomination, quantity, side, out=buffer[:shape[0]])
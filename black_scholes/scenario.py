@@ -0,0 +1,118 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Sequence, Tuple, Union
+import numpy as np
+from black_scholes.batch import is_call
+from black_scholes.vectorized import option_values
+
+DEFAULT_CHUNK_CELLS = 1 << 18 # leg valuations per chunk, bounds the memory of each worker
+EXECUTORS = ("thread", "process")
+
+
+@dataclass
+class Portfolio:
+    """European option legs on a single underlying. quantity is signed, negative for short legs."""
+    strike: np.ndarray
+    time_to_exp_days: np.ndarray
+    volatility: np.ndarray
+    kind: np.ndarray
+    quantity: np.ndarray
+    risk_free_rate: float = 0.0
+    calls: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.strike, self.time_to_exp_days, self.volatility, self.quantity, self.calls = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(a, dtype=np.float64)) for a in (self.strike, self.time_to_exp_days, self.volatility, self.quantity)),
+            np.atleast_1d(is_call(self.kind)))
+        if self.strike.ndim != 1:
+            raise ValueError("Portfolio legs must be 1-D")
+
+    def __len__(self) -> int:
+        return self.strike.shape[0]
+
+
+def _evaluate_chunk(portfolio: Portfolio, spot: np.ndarray, vol_shifts: np.ndarray, rate_shifts: np.ndarray,
+                    days_elapsed: np.ndarray, out: np.ndarray, start: int, stop: int) -> None:
+    # values cube cells [start, stop) of the flattened (spot, vol, rate, time) cube into out
+    s, v, r, t = np.unravel_index(np.arange(start, stop), out.shape)
+    time_to_exp_years = (portfolio.time_to_exp_days - days_elapsed[t, np.newaxis])/365
+    live = time_to_exp_years > 0
+    S = spot[s, np.newaxis]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        call_values, put_values = option_values(S, np.where(live, time_to_exp_years, np.nan), portfolio.strike,
+                                                portfolio.risk_free_rate + rate_shifts[r, np.newaxis],
+                                                portfolio.volatility + vol_shifts[v, np.newaxis])
+    # expired legs are worth their intrinsic value
+    call_values = np.where(live, call_values, np.maximum(S - portfolio.strike, 0.0))
+    put_values = np.where(live, put_values, np.maximum(portfolio.strike - S, 0.0))
+    out.reshape(-1)[start:stop] = np.where(portfolio.calls, call_values, put_values) @ portfolio.quantity
+
+
+def _evaluate_memmap_chunk(path: str, dtype: str, offset: int, shape: Tuple[int, ...], portfolio: Portfolio, spot: np.ndarray,
+                           vol_shifts: np.ndarray, rate_shifts: np.ndarray, days_elapsed: np.ndarray, start: int, stop: int) -> None:
+    # process pool entry point, workers write straight into the shared file so nothing is pickled back
+    out = np.memmap(path, dtype=dtype, mode="r+", offset=offset, shape=shape)
+    _evaluate_chunk(portfolio, spot, vol_shifts, rate_shifts, days_elapsed, out, start, stop)
+    out.flush()
+
+
+def scenario_cube(portfolio: Portfolio, spot: Sequence[float], vol_shifts: Sequence[float] = (0.0,),
+                  rate_shifts: Sequence[float] = (0.0,), days_elapsed: Sequence[float] = (0.0,),
+                  out: Union[np.ndarray, str, None] = None, dtype=np.float64,
+                  chunk_cells: int = DEFAULT_CHUNK_CELLS, workers: Optional[int] = None,
+                  executor: str = "thread") -> np.ndarray:
+    """Values a portfolio over every combination of spot, volatility, rate and time shocks.
+
+    The cube is split into chunks of roughly chunk_cells leg valuations which are
+    evaluated concurrently. Threads share the output array directly, since NumPy
+    releases the GIL in its kernels. Processes write into a memory-mapped file so
+    results are never pickled back.
+
+    Args:
+        portfolio (Portfolio): legs to value
+        spot: absolute underlying prices
+        vol_shifts: additive shifts applied to every leg's volatility
+        rate_shifts: additive shifts applied to the risk free rate
+        days_elapsed: days rolled forward; legs past expiry are worth their intrinsic value
+        out (Union[np.ndarray, str, None]): array or memmap to write into, or a file path for a new memmap.
+            The "process" executor needs a memmap or a path, the caller owns (and deletes) the file.
+        dtype: dtype of a newly allocated output
+        chunk_cells (int): approximate leg valuations per chunk
+        workers (Optional[int]): pool size, defaults to the number of CPUs
+        executor (str): "thread" or "process"
+
+    Returns:
+        np.ndarray: portfolio value of shape (len(spot), len(vol_shifts), len(rate_shifts), len(days_elapsed))
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"executor must be one of {EXECUTORS}, got {executor!r}")
+    spot, vol_shifts, rate_shifts, days_elapsed = (np.atleast_1d(np.asarray(a, dtype=np.float64))
+                                                   for a in (spot, vol_shifts, rate_shifts, days_elapsed))
+    shape = (spot.shape[0], vol_shifts.shape[0], rate_shifts.shape[0], days_elapsed.shape[0])
+    if executor == "process" and not isinstance(out, (np.memmap, str, os.PathLike)):
+        raise ValueError("the process executor writes into a np.memmap, pass a memmap or a file path as out")
+    if isinstance(out, (str, os.PathLike)):
+        out = np.memmap(out, dtype=dtype, mode="w+", shape=shape)
+    elif out is None:
+        out = np.empty(shape, dtype=dtype)
+    if out.shape != shape or not out.flags.c_contiguous:
+        raise ValueError(f"out must be a C-contiguous array of shape {shape}")
+
+    size = int(np.prod(shape))
+    step = max(1, chunk_cells//max(len(portfolio), 1))
+    chunks = [(start, min(start + step, size)) for start in range(0, size, step)]
+    workers = workers or os.cpu_count() or 1
+    if executor == "thread":
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(_evaluate_chunk, portfolio, spot, vol_shifts, rate_shifts, days_elapsed, out, start, stop)
+                           for start, stop in chunks]:
+                future.result()
+    else:
+        out.flush()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(_evaluate_memmap_chunk, out.filename, out.dtype.str, out.offset, shape, portfolio,
+                                       spot, vol_shifts, rate_shifts, days_elapsed, start, stop)
+                           for start, stop in chunks]:
+                future.result()
+    return out
@@ -0,0 +1,313 @@
+"""Headless HTTP/JSON pricing service.
+
+Run it with:
+    python -m black_scholes.service --host 127.0.0.1 --port 8000
+
+Endpoints, all JSON:
+    POST /price    {"S", "K", "T", "r", "sigma", "kind"} scalars or equal-length lists -> {"price"}
+    POST /greeks   same body -> {"price", "delta", "gamma", "vega", "theta", "rho"}
+    POST /pnl      {"values", "premium", "denomination", optional "quantity", "side"} -> {"pnl"}
+    POST /grid     the six numeric BlackScholes arguments, optional "price_steps"/"time_steps" (at most
+                   MAX_GRID_STEPS) and "outputs" -> axes and call/put grids
+    GET  /metrics  per-endpoint latency and batching statistics, plus pipeline stages with --instrument
+    GET  /health
+
+Concurrent /price and /greeks requests are coalesced into micro-batches that are
+priced with a single vectorized price_batch call in a worker pool, off the event loop.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from black_scholes import instrumentation
+from black_scholes.BlackScholes import BlackScholes
+from black_scholes.batch import BATCH_OUTPUTS, is_call, price_batch
+from black_scholes.pnl import pnl
+from black_scholes.vectorized import OUTPUTS
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+CONTRACT_FIELDS = ("S", "K", "T", "r", "sigma")
+# /grid accepts only these BlackScholes arguments; the integer ones feed range()
+GRID_FIELDS = {"current_underlying_price": float, "time_to_exp_days": int, "strike_price": float,
+               "risk_free_rate": float, "volatility": float, "price_range_to_display": int}
+MAX_GRID_STEPS = 1000 # upper bound of price_steps and time_steps per /grid request
+
+
+class LatencyMetrics:
+    """Request counts, errors and latency percentiles over the most recent requests of each endpoint"""
+
+    def __init__(self, window: int = 4096) -> None:
+        self.window = window
+        self.counts = {}
+        self.errors = {}
+        self._latencies = {}
+
+    def record(self, endpoint: str, seconds: float, error: bool = False) -> None:
+        self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+        self.errors[endpoint] = self.errors.get(endpoint, 0) + int(error)
+        self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        snapshot = {}
+        for endpoint, latencies in self._latencies.items():
+            latencies = np.asarray(latencies)
+            snapshot[endpoint] = {"count": self.counts[endpoint], "errors": self.errors[endpoint],
+                                  "mean_ms": float(latencies.mean()*1e3),
+                                  "p50_ms": float(np.percentile(latencies, 50)*1e3),
+                                  "p95_ms": float(np.percentile(latencies, 95)*1e3),
+                                  "p99_ms": float(np.percentile(latencies, 99)*1e3)}
+        return snapshot
+
+
+class MicroBatcher:
+    """Coalesces contracts submitted concurrently into one call of func.
+
+    A batch is flushed once it holds max_batch contracts or max_delay seconds after
+    its first submission, whichever comes first. func receives the concatenated
+    S, K, T, r, sigma and call mask arrays and runs in executor.
+    """
+
+    def __init__(self, func: Callable[..., Dict[str, np.ndarray]], executor, max_batch: int = 8192,
+                 max_delay: float = 0.002) -> None:
+        self.func = func
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.contracts = 0
+        self._pending: List[Tuple[Tuple[np.ndarray, ...], asyncio.Future]] = []
+        self._pending_size = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, columns: Tuple[np.ndarray, ...]) -> Dict[str, np.ndarray]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((columns, future))
+        self._pending_size += columns[0].shape[0]
+        if self._pending_size >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_size = self._pending, [], 0
+        if batch:
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch) -> None:
+        sizes = [columns[0].shape[0] for columns, _ in batch]
+        merged = [np.concatenate(column) for column in zip(*(columns for columns, _ in batch))]
+        self.batches += 1
+        self.contracts += sum(sizes)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.func, *merged)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        offsets = np.cumsum([0] + sizes)
+        for (_, future), start, stop in zip(batch, offsets[:-1], offsets[1:]):
+            if not future.done():
+                future.set_result({name: values[start:stop] for name, values in results.items()})
+
+
+def _contracts(body: dict) -> Tuple[Tuple[np.ndarray, ...], bool]:
+    # validates one request's contracts before it joins a batch, so a bad request cannot fail the others
+    missing = [name for name in CONTRACT_FIELDS + ("kind",) if name not in body]
+    if missing:
+        raise ValueError(f"missing fields {missing}")
+    scalar = all(np.ndim(body[name]) == 0 for name in CONTRACT_FIELDS + ("kind",))
+    columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(body[name], dtype=np.float64)) for name in CONTRACT_FIELDS),
+                                  np.atleast_1d(is_call(body["kind"])))
+    if columns[0].ndim != 1:
+        raise ValueError("contract fields must be scalars or 1-D lists")
+    return tuple(np.ascontiguousarray(column) for column in columns), scalar
+
+
+def _grid_arguments(body: dict) -> dict:
+    # whitelists and bounds the constructor arguments so a request cannot pick the engine or an unbounded grid size
+    unknown = set(body) - set(GRID_FIELDS) - {"price_steps", "time_steps"}
+    missing = set(GRID_FIELDS) - set(body)
+    if unknown or missing:
+        raise ValueError(f"unknown fields {sorted(unknown)}, missing fields {sorted(missing)}")
+    arguments = {}
+    for name, kind in GRID_FIELDS.items():
+        value = body[name]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or (kind is int and value != int(value)):
+            raise ValueError(f"{name} must be {'an integer' if kind is int else 'a number'}")
+        arguments[name] = kind(value)
+    if arguments["time_to_exp_days"] < 1 or arguments["price_range_to_display"] < 1:
+        raise ValueError("time_to_exp_days and price_range_to_display must be at least 1")
+    for name in ("price_steps", "time_steps"):
+        value = body.get(name)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= MAX_GRID_STEPS:
+            raise ValueError(f"{name} must be an integer between 1 and {MAX_GRID_STEPS}")
+        arguments[name] = value
+    return arguments
+
+
+def _to_json(values: np.ndarray, scalar: bool = False):
+    # JSON has no NaN or infinity, undefined results (e.g. a negative spot) are sent as null
+    finite = np.isfinite(values)
+    values = values.tolist() if finite.all() else np.where(finite, values, None).tolist()
+    return values[0] if scalar else values
+
+
+class PricingService:
+    """Routes JSON requests to the pricing functions. Use handle() in-process or serve() over HTTP."""
+
+    def __init__(self, workers: Optional[int] = None, max_batch: int = 8192, max_delay: float = 0.002) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pricing")
+        self.batcher = MicroBatcher(lambda S, K, T, r, sigma, calls: price_batch(S, K, T, r, sigma, calls, chunk_size=None),
+                                    self.executor, max_batch, max_delay)
+        self.metrics = LatencyMetrics()
+        self.routes = {("POST", "/price"): self._price, ("POST", "/greeks"): self._greeks,
+                       ("POST", "/pnl"): self._pnl, ("POST", "/grid"): self._grid,
+                       ("GET", "/metrics"): self._metrics, ("GET", "/health"): self._health}
+
+    async def handle(self, method: str, path: str, body: bytes = b"") -> Tuple[int, dict]:
+        """Serves one request
+
+        Returns:
+            Tuple[int, dict]: HTTP status and JSON payload
+        """
+        start = time.perf_counter()
+        route = self.routes.get((method, path))
+        if route is None:
+            status = 405 if any(p == path for _, p in self.routes) else 404
+            return status, {"error": f"{method} {path} is not supported"}
+        try:
+            status, payload = 200, await route(json.loads(body) if body else {})
+        except (ValueError, TypeError, KeyError) as error:
+            status, payload = 400, {"error": str(error)}
+        except Exception as error:
+            status, payload = 500, {"error": repr(error)}
+        self.metrics.record(path, time.perf_counter() - start, error=status != 200)
+        return status, payload
+
+    async def _price(self, body: dict) -> dict:
+        columns, scalar = _contracts(body)
+        results = await self.batcher.submit(columns)
+        return {"price": _to_json(results["price"], scalar)}
+
+    async def _greeks(self, body: dict) -> dict:
+        columns, scalar = _contracts(body)
+        results = await self.batcher.submit(columns)
+        return {name: _to_json(results[name], scalar) for name in BATCH_OUTPUTS}
+
+    async def _pnl(self, body: dict) -> dict:
+        values = await asyncio.get_running_loop().run_in_executor(
+            self.executor, lambda: pnl(body["values"], body["premium"], body["denomination"],
+                                       body.get("quantity", 1), body.get("side", 1)))
+        return {"pnl": _to_json(values)}
+
+    async def _grid(self, body: dict) -> dict:
+        outputs = tuple(body.pop("outputs", OUTPUTS))
+        unknown = set(outputs) - set(OUTPUTS)
+        if unknown:
+            raise ValueError(f"unknown outputs {sorted(unknown)}")
+
+        arguments = _grid_arguments(body)
+
+        def evaluate():
+            model = BlackScholes(**arguments)
+            grid = model.evaluate_grid(outputs)
+            return {"price_range": list(model.price_range_display), "time_list": list(model.time_list_display),
+                    **{output: {"call": _to_json(call), "put": _to_json(put)} for output, (call, put) in grid.items()}}
+        return await asyncio.get_running_loop().run_in_executor(self.executor, evaluate)
+
+    async def _metrics(self, body: dict) -> dict:
+        metrics = {"endpoints": self.metrics.snapshot(),
+                   "batching": {"batches": self.batcher.batches, "contracts": self.batcher.contracts}}
+        if instrumentation.is_enabled():
+            metrics["instrumentation"] = instrumentation.snapshot()
+        return metrics
+
+    async def _health(self, body: dict) -> dict:
+        return {"status": "ok"}
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # minimal HTTP/1.1 with keep-alive and Content-Length bodies
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self.handle(method, target.split("?")[0], body)
+                data = json.dumps(payload, allow_nan=False).encode()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._connection, host, port)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+
+class ServiceClient:
+    """In-process client that calls a PricingService without a socket, for tests and embedding"""
+
+    def __init__(self, service: PricingService) -> None:
+        self.service = service
+
+    async def get(self, path: str) -> Tuple[int, dict]:
+        return await self.service.handle("GET", path)
+
+    async def post(self, path: str, payload: dict) -> Tuple[int, dict]:
+        return await self.service.handle("POST", path, json.dumps(payload).encode())
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Black-Scholes pricing service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="pricing threads")
+    parser.add_argument("--max-batch", type=int, default=8192, help="contracts per micro-batch")
+    parser.add_argument("--max-delay", type=float, default=0.002, help="seconds a micro-batch waits to fill")
+    parser.add_argument("--instrument", action="store_true", help="record pipeline stage timings, reported by /metrics")
+    args = parser.parse_args(argv)
+    if args.instrument:
+        instrumentation.enable()
+    service = PricingService(args.workers, args.max_batch, args.max_delay)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Standard normal CDF and PDF kernels for the pricing engine.
+
+scipy.stats.norm validates its arguments and applies loc/scale on every call,
+which costs ~50us per scalar and roughly doubles the time spent on arrays. These
+kernels call scipy.special.ndtr directly and compute the PDF with a single exp.
+
+Error bounds, against a float64 reference:
+    float64 with SciPy: identical to scipy.stats.norm
+    float64 without SciPy (Hart's algorithm): absolute error below 3e-16,
+        relative error below 1e-8 in the lower tail, 0 below x = -37
+    float32: absolute error below 1e-7 for the CDF and the PDF; relative error of the PDF
+        below 1e-6 for |x| < 4, growing as x**2 * 6e-8 beyond
+
+SciPy is imported on the first call, which takes ~0.4s, and makes the CDF ~1.6x
+faster on large arrays. Set BLACK_SCHOLES_CDF=numpy to always use Hart's algorithm
+and keep pricing NumPy only, e.g. for short lived worker processes.
+"""
+import os
+from typing import Optional
+import numpy as np
+
+_SQRT_2PI = np.sqrt(2*np.pi)
+_ndtr = None
+
+
+def _hart_cdf(x: np.ndarray) -> np.ndarray:
+    # Hart's double precision algorithm (as given by West, 2005), NumPy only
+    x = np.asarray(x, dtype=np.float64) # float32 arithmetic would exceed the float32 error bound
+    shape = x.shape
+    x = np.atleast_1d(x) # the tail is assigned in place, which 0-d results do not support
+    a = np.abs(x)
+    exponential = np.exp(-a*a/2)
+    numerator = ((((((3.52624965998911e-02*a + 0.700383064443688)*a + 6.37396220353165)*a + 33.912866078383)*a
+                   + 112.079291497871)*a + 221.213596169931)*a + 220.206867912376)
+    denominator = (((((((8.83883476483184e-02*a + 1.75566716318264)*a + 16.064177579207)*a + 86.7807322029461)*a
+                      + 296.564248779674)*a + 637.333633378831)*a + 793.826512519948)*a + 440.413735824752)
+    cdf = exponential*numerator/denominator
+    tail = a >= 7.07106781186547
+    if np.any(tail):
+        a_tail = a[tail]
+        cdf[tail] = exponential[tail]/(a_tail + 1/(a_tail + 2/(a_tail + 3/(a_tail + 4/(a_tail + 0.65)))))/2.506628274631
+    cdf[a > 37] = 0.0
+    return np.where(x > 0, 1 - cdf, cdf).reshape(shape)
+
+
+def _load_ndtr():
+    # SciPy is imported on first use and is optional, without it Hart's algorithm is used
+    global _ndtr
+    if _ndtr is None:
+        _ndtr = _hart_cdf
+        if os.environ.get("BLACK_SCHOLES_CDF", "scipy").lower() != "numpy":
+            try:
+                from scipy.special import ndtr
+                _ndtr = ndtr
+            except ImportError:
+                pass
+    return _ndtr
+
+
+def _as_float(x, dtype) -> np.ndarray:
+    x = np.asarray(x)
+    if dtype is not None:
+        return x.astype(dtype, copy=False)
+    if x.dtype not in (np.float32, np.float64):
+        return x.astype(np.float64)
+    return x
+
+
+def norm_cdf(x, dtype: Optional[type] = None) -> np.ndarray:
+    """Standard normal cumulative distribution function
+
+    Args:
+        x: points to evaluate
+        dtype (Optional[type]): np.float32 or np.float64. Defaults to the dtype of x, float64 for non-float input.
+
+    Returns:
+        np.ndarray: N(x)
+    """
+    x = _as_float(x, dtype)
+    cdf = _load_ndtr()(x)
+    return cdf.astype(x.dtype, copy=False)
+
+
+def norm_pdf(x, dtype: Optional[type] = None) -> np.ndarray:
+    """Standard normal probability density function
+
+    Args:
+        x: points to evaluate
+        dtype (Optional[type]): np.float32 or np.float64. Defaults to the dtype of x, float64 for non-float input.
+
+    Returns:
+        np.ndarray: n(x)
+    """
+    x = _as_float(x, dtype)
+    return np.exp(-x**2/2.0)/x.dtype.type(_SQRT_2PI)
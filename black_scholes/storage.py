@@ -0,0 +1,121 @@
+import os
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Sequence, Tuple
+import numpy as np
+from black_scholes.vectorized import GREEKS, evaluate_grid
+if TYPE_CHECKING:
+    from black_scholes.engines import PricingEngine
+
+GRID_COLUMNS = tuple(f"{option}_{name.lower()}" for name in ("Value",) + GREEKS for option in ("call", "put"))
+DEFAULT_CHUNK_CELLS = 1 << 20 # cells evaluated per chunk while writing
+
+
+def _grid_chunks(price_range: Sequence[float], time_list_days: Sequence[float], strike: float,
+                 risk_free_rate: float, volatility: float,
+                 chunk_cells: int, engine: Optional["PricingEngine"] = None) -> Iterator[Tuple[slice, Dict[str, np.ndarray]]]:
+    # evaluates the grid a block of spot price rows at a time, with the closed form unless an engine is given
+    evaluate = evaluate_grid if engine is None else engine.evaluate_grid
+    price_range = np.asarray(price_range, dtype=np.float64)
+    rows = max(1, chunk_cells//max(len(time_list_days), 1))
+    for start in range(0, price_range.shape[0], rows):
+        chunk = slice(start, start + rows)
+        grid = evaluate(price_range[chunk], time_list_days, strike, risk_free_rate, volatility)
+        yield chunk, {f"{option}_{name.lower()}": values[i]
+                      for name, values in grid.items() for i, option in enumerate(("call", "put"))}
+
+
+def write_grid_npy(directory: str, price_range: Sequence[float], time_list_days: Sequence[float], strike: float,
+                   risk_free_rate: float, volatility: float, dtype=np.float32,
+                   chunk_cells: int = DEFAULT_CHUNK_CELLS, engine: Optional["PricingEngine"] = None) -> Dict[str, np.memmap]:
+    """Evaluates the value and Greek grids straight into one memory-mapped .npy file
+    per column, so the full grid never has to fit in memory.
+
+    The directory holds spot.npy, days.npy and a (spot x days) array for each name
+    in GRID_COLUMNS. Open it again with open_grid_npy. Pass a PricingEngine as engine
+    to evaluate with it instead of the closed form.
+
+    Returns:
+        Dict[str, np.memmap]: the written arrays keyed by file name without extension
+    """
+    os.makedirs(directory, exist_ok=True)
+    shape = (len(price_range), len(time_list_days))
+    np.save(os.path.join(directory, "spot.npy"), np.asarray(price_range, dtype=np.float64))
+    np.save(os.path.join(directory, "days.npy"), np.asarray(time_list_days, dtype=np.float64))
+    columns = {name: np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+               for name in GRID_COLUMNS}
+    for chunk, values in _grid_chunks(price_range, time_list_days, strike, risk_free_rate, volatility, chunk_cells, engine):
+        for name, column in columns.items():
+            column[chunk] = values[name]
+    for column in columns.values():
+        column.flush()
+    return columns
+
+
+def open_grid_npy(directory: str, mode: str = "r") -> Dict[str, np.ndarray]:
+    """Memory-maps a grid written by write_grid_npy without reading it into memory
+
+    Returns:
+        Dict[str, np.ndarray]: "spot", "days" and every name in GRID_COLUMNS
+    """
+    return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+            for name in ("spot", "days") + GRID_COLUMNS}
+
+
+def _record_batches(price_range: Sequence[float], time_list_days: Sequence[float], strike: float,
+                    risk_free_rate: float, volatility: float, dtype, chunk_cells: int, engine: Optional["PricingEngine"] = None):
+    import pyarrow as pa
+    price_range = np.asarray(price_range, dtype=np.float64)
+    days = np.asarray(time_list_days, dtype=np.float64)
+    for chunk, values in _grid_chunks(price_range, days, strike, risk_free_rate, volatility, chunk_cells, engine):
+        spot = price_range[chunk]
+        columns = {"spot": np.repeat(spot, days.shape[0]), "days": np.tile(days, spot.shape[0])}
+        columns.update((name, values[name].astype(dtype, copy=False).ravel()) for name in GRID_COLUMNS)
+        yield pa.RecordBatch.from_pydict(columns)
+
+
+def write_grid_arrow(path: str, price_range: Sequence[float], time_list_days: Sequence[float], strike: float,
+                     risk_free_rate: float, volatility: float, dtype=np.float32,
+                     chunk_cells: int = DEFAULT_CHUNK_CELLS, engine: Optional["PricingEngine"] = None) -> str:
+    """Streams the value and Greek grids to an uncompressed Arrow IPC file in long
+    form, one row per (spot, days) cell, one record batch per chunk. Open it
+    zero-copy with open_grid_arrow.
+
+    Returns:
+        str: path
+    """
+    import pyarrow as pa
+    batches = _record_batches(price_range, time_list_days, strike, risk_free_rate, volatility, dtype, chunk_cells, engine)
+    first = next(batches)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, first.schema) as writer:
+        writer.write_batch(first)
+        for batch in batches:
+            writer.write_batch(batch)
+    return path
+
+
+def open_grid_arrow(path: str):
+    """Memory-maps an Arrow IPC grid; columns reference the mapped file without copying
+
+    Returns:
+        pa.Table: the grid in long form
+    """
+    import pyarrow as pa
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def write_grid_parquet(path: str, price_range: Sequence[float], time_list_days: Sequence[float], strike: float,
+                       risk_free_rate: float, volatility: float, dtype=np.float32,
+                       chunk_cells: int = DEFAULT_CHUNK_CELLS, compression: str = "zstd", engine: Optional["PricingEngine"] = None) -> str:
+    """Streams the value and Greek grids to a compressed Parquet file in long form,
+    one row group per chunk. Smaller on disk than Arrow IPC but decoded on read.
+
+    Returns:
+        str: path
+    """
+    import pyarrow.parquet as pq
+    batches = _record_batches(price_range, time_list_days, strike, risk_free_rate, volatility, dtype, chunk_cells, engine)
+    first = next(batches)
+    with pq.ParquetWriter(path, first.schema, compression=compression) as writer:
+        writer.write_batch(first)
+        for batch in batches:
+            writer.write_batch(batch)
+    return path
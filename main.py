@@ -1,10 +1,32 @@
+import json
+import os
+from contextlib import nullcontext
 import streamlit as st
-import math
 import numpy as np
+from black_scholes import instrumentation
 from black_scholes.BlackScholes import BlackScholes
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+from black_scholes.cache import LRUCache, freeze, make_key
+from black_scholes.charts import altair_heatmap, matplotlib_heatmap
+from black_scholes.engines import BinomialEngine, BlackScholesEngine, MonteCarloEngine
+from black_scholes.storage import GRID_COLUMNS, open_grid_npy
+
+GRID_CACHE_SIZE = 128 # evaluated grids, keyed on the model inputs
+FIGURE_CACHE_SIZE = 256 # rendered heatmaps, keyed on the model inputs, heatmap selection and renderer
+STORED_GRID_MAX_CELLS = (200, 100) # spot x days shown from a stored grid, larger grids are strided
+GRID_BASE_DIRECTORY = os.path.realpath(os.environ.get("BLACK_SCHOLES_GRID_DIR", "grids")) # stored grids are only read and written below this
+
+
+@st.cache_resource
+def get_caches():
+    """Caches shared by every session served by this process"""
+    return {"grid": LRUCache(GRID_CACHE_SIZE), "figure": LRUCache(FIGURE_CACHE_SIZE)}
+
+
+@st.cache_resource
+def get_engines():
+    """Pricing engines offered by the app, sized to price a heatmap interactively"""
+    return {"Black-Scholes": BlackScholesEngine(), "Binomial (American)": BinomialEngine(steps=200),
+            "Monte Carlo": MonteCarloEngine(paths=20_000, seed=0)}
 
 # Page configuration
 st.set_page_config(
@@ -82,66 +104,122 @@ displayed_price_range = st.slider("Range (%)",1,455,100)
 pnl_list = ['P/L $', 'P/L %', 'Value', 'Greeks']
 greek_list = ['Delta', 'Theta', 'Gamma', 'Vega', 'Rho']
 heatmap_selection = st.selectbox(label="Heatmap Type", options=pnl_list, index=2)
+renderer_list = ['Interactive', 'Static']
+engine_name = st.radio("Pricing engine", options=list(get_engines()), horizontal=True, help="Binomial prices American options on a Cox-Ross-Rubinstein lattice; Monte Carlo simulates 20,000 paths. Their Greeks are computed by bumping and repricing")
+engine = get_engines()[engine_name]
+renderer = st.radio("Renderer", options=renderer_list, horizontal=True, help="Interactive heatmaps are drawn in the browser; static heatmaps are rendered on the server with matplotlib")
+
+model_inputs = make_key(current_underlying_price, time_to_exp_days, strike_price, risk_free_rate, volatility, displayed_price_range, engine_name)
+caches = get_caches()
+
+
+def load_grid():
+    """Evaluates the value and Greek grids once per set of model inputs. Each session keeps
+    its own model so that moving one slider only recomputes the terms depending on it"""
+    b_scholes = st.session_state.get("b_scholes")
+    if b_scholes is None:
+        b_scholes = st.session_state["b_scholes"] = BlackScholes(current_underlying_price, time_to_exp_days, strike_price, risk_free_rate, volatility, displayed_price_range, engine=engine)
+    else:
+        b_scholes.update(current_underlying_price=current_underlying_price, time_to_exp_days=time_to_exp_days, strike_price=strike_price,
+                         risk_free_rate=risk_free_rate, volatility=volatility, price_range_to_display=displayed_price_range, engine=engine)
+    # the session model keeps changing, cache a snapshot of its display axes
+    return list(b_scholes.price_range_display), list(b_scholes.time_list_display), freeze(b_scholes.evaluate_grid())
+
 
-time_list_display = []
-if time_to_exp_days < 7:
-    time_list_display = [d for d in range(time_to_exp_days,0,-1)]
-else:
-    time_list_display = [time_to_exp_days - (n*(math.ceil(time_to_exp_days/7))) for n in range(0,7)]
-#print("time to display: ", time_list_display)
-b_scholes = BlackScholes(current_underlying_price, time_to_exp_days, strike_price, risk_free_rate, volatility, displayed_price_range)
+def heatmap_values(grid, selection):
+    """Rounds the cached grid to the heatmap's values. P/L is derived from the cached value grid"""
+    call_values, put_values = [np.round(values, 3) for values in grid[selection if selection in greek_list else "Value"]]
+    if selection in ('P/L $', 'P/L %'):
+        return (BlackScholes.calculate_pnl(call_values, price_paid, selection),
+                BlackScholes.calculate_pnl(put_values, price_paid, selection))
+    return call_values, put_values
+
+
+selection = heatmap_selection
 if heatmap_selection == 'Greeks':
-    greek_selection = st.selectbox(label="Greek", options=greek_list)
-    # generate heatmap of greeks
-    call_greeks, put_greeks = b_scholes.calculate_greeks(greek_selection)
-    fig_call, ax_call = plt.subplots(figsize=(10,7)) # Call
-    fig_put, ax_put = plt.subplots(figsize=(10,7)) # Put
-    
-    sns.heatmap(call_greeks, xticklabels=time_list_display, yticklabels=np.round(b_scholes.price_range_display, 2), annot=True, fmt=".2f", cmap="RdYlGn", ax=ax_call, cbar=False)
-    sns.heatmap(put_greeks, xticklabels=time_list_display, yticklabels=np.round(b_scholes.price_range_display, 2), annot=True, fmt=".2f", cmap="RdYlGn", ax=ax_put, cbar=False)
-    
-    ax_call.set_title('CALL')
-    ax_call.set_xlabel('Days to Expiry')
-    ax_call.set_ylabel('Spot Price')
-    
-    ax_put.set_title('PUT')
-    ax_put.set_xlabel('Days to Expiry')
-    ax_put.set_ylabel('Spot Price')
-    plt.yticks(rotation=0)
-    plt.tight_layout()
-# else generate PnL heatmaps
-else:
-    call_value, put_value = b_scholes.calculate_price()
-    fig_call, ax_call = plt.subplots(figsize=(10,7)) # Call
-    fig_put, ax_put = plt.subplots(figsize=(10,7)) # Put
-    
-    
-    if heatmap_selection == 'Value':
-        sns.heatmap(call_value, xticklabels=time_list_display, yticklabels=np.round(b_scholes.price_range_display, 2), annot=True, fmt=".2f", cmap="RdYlGn", ax=ax_call, cbar=False)
-        sns.heatmap(put_value, xticklabels=time_list_display, yticklabels=np.round(b_scholes.price_range_display, 2), annot=True, fmt=".2f", cmap="RdYlGn", ax=ax_put, cbar=False)
+    selection = st.selectbox(label="Greek", options=greek_list)
+figure_key = model_inputs + (selection, price_paid if selection in ('P/L $', 'P/L %') else None, renderer)
+
+
+def load_figures():
+    call_values, put_values = heatmap_values(grid, selection)
+    render = altair_heatmap if renderer == 'Interactive' else matplotlib_heatmap
+    with instrumentation.stage(f"render_heatmaps[{renderer}]"):
+        return (render(call_values, price_range_display, time_list_display, 'CALL'),
+                render(put_values, price_range_display, time_list_display, 'PUT'))
+
+
+def show_heatmap(heatmap):
+    if renderer == 'Interactive':
+        st.altair_chart(heatmap, use_container_width=True)
     else:
-        sns.heatmap(BlackScholes.calculate_pnl(call_value,price_paid,heatmap_selection), xticklabels=time_list_display, yticklabels=np.round(b_scholes.price_range_display, 2), annot=True, fmt=".2f", cmap="RdYlGn", ax=ax_call, cbar=False)
-        sns.heatmap(BlackScholes.calculate_pnl(put_value,price_paid,heatmap_selection), xticklabels=time_list_display, yticklabels=np.round(b_scholes.price_range_display, 2), annot=True, fmt=".2f", cmap="RdYlGn", ax=ax_put, cbar=False)
-       
-    
-    ax_call.set_title('CALL')
-    ax_call.set_xlabel('Days to Expiry')
-    ax_call.set_ylabel('Spot Price')
-    
-    ax_put.set_title('PUT')
-    ax_put.set_xlabel('Days to Expiry')
-    ax_put.set_ylabel('Spot Price')
-    plt.yticks(rotation=0)
-    plt.tight_layout()
+        st.image(heatmap)
 
 
+# the Performance panel at the bottom sets this, widget state is updated before each rerun
+with instrumentation.profile() if st.session_state.get("profile_rerun") else nullcontext() as profiler:
+    with instrumentation.stage("load_grid"):
+        price_range_display, time_list_display, grid = caches["grid"].get_or_compute(model_inputs, load_grid)
+    call_heatmap, put_heatmap = caches["figure"].get_or_compute(figure_key, load_figures)
 
 col1, col2 = st.columns([1,1], gap="small")
 
-with col1:
-    st.subheader("European call option Heatmap")
-    st.pyplot(fig_call)
-
-with col2:
-    st.subheader("European put option Heatmap")
-    st.pyplot(fig_put)
+with instrumentation.stage("display_heatmaps"):
+    with col1:
+        st.subheader(f"{engine.exercise.capitalize()} call option Heatmap")
+        show_heatmap(call_heatmap)
+
+    with col2:
+        st.subheader(f"{engine.exercise.capitalize()} put option Heatmap")
+        show_heatmap(put_heatmap)
+instrumentation.count("reruns")
+
+def stored_grid_directory(name):
+    """Resolves name below GRID_BASE_DIRECTORY, None for paths that escape it"""
+    directory = os.path.realpath(os.path.join(GRID_BASE_DIRECTORY, name))
+    return directory if os.path.commonpath([directory, GRID_BASE_DIRECTORY]) == GRID_BASE_DIRECTORY else None
+
+
+with st.expander("Stored grid"):
+    grid_name = st.text_input("Grid directory", help=f"A directory of memory-mapped .npy columns written by BlackScholes.write_grid(path, format='npy'), relative to {GRID_BASE_DIRECTORY}")
+    grid_directory = stored_grid_directory(grid_name) if grid_name else None
+    if grid_name and grid_directory is None:
+        st.error(f"Grid directories must be inside {GRID_BASE_DIRECTORY}")
+    if grid_directory and st.button("Write the current grid here"):
+        # built from the current inputs, the session model may be missing or stale when the grid came from the shared cache
+        BlackScholes(current_underlying_price, time_to_exp_days, strike_price, risk_free_rate, volatility, displayed_price_range,
+                     engine=engine).write_grid(grid_directory, format="npy")
+    if grid_directory and os.path.isfile(os.path.join(grid_directory, "spot.npy")):
+        # memory-mapped, only the strided cells shown below are read from disk
+        stored = open_grid_npy(grid_directory)
+        column = st.selectbox("Column", options=GRID_COLUMNS)
+        rows, columns = (slice(None, None, max(1, -(-size//limit))) for size, limit in zip(stored[column].shape, STORED_GRID_MAX_CELLS))
+        st.caption(f"{stored[column].shape[0]} x {stored[column].shape[1]} cells, {stored[column].dtype}")
+        render = altair_heatmap if renderer == 'Interactive' else matplotlib_heatmap
+        show_heatmap(render(np.asarray(stored[column][rows, columns]), stored["spot"][rows], stored["days"][columns], column))
+    elif grid_directory:
+        st.caption("No stored grid in this directory yet")
+
+with st.expander("Cache statistics"):
+    st.table({name: cache.stats() for name, cache in caches.items()})
+
+def toggle_recording():
+    # recording is process-wide, so it only changes when someone ticks the box, not on every rerun
+    if st.session_state["record_stages"]:
+        instrumentation.enable()
+    else:
+        instrumentation.disable()
+
+
+with st.expander("Performance"):
+    st.session_state["record_stages"] = instrumentation.is_enabled() # show the current state set by any session
+    st.checkbox("Record stage timings", key="record_stages", on_change=toggle_recording,
+                help="Applies to every session served by this process")
+    st.checkbox("Profile each rerun", key="profile_rerun", help="Runs cProfile over grid evaluation and heatmap rendering")
+    metrics = instrumentation.snapshot()
+    if metrics["stages"]:
+        st.table({name: {key: round(value, 3) for key, value in stats.items()} for name, stats in metrics["stages"].items()})
+        st.table({"count": metrics["counters"]})
+        st.download_button("Download metrics", json.dumps(metrics, indent=2), file_name="metrics.json", mime="application/json")
+    if profiler is not None:
+        st.code(instrumentation.profile_report(profiler), language=None)
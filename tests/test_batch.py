@@ -0,0 +1,50 @@
+from py_vollib.black_scholes import black_scholes as bs
+from py_vollib.black_scholes.greeks.analytical import delta, gamma, vega, theta, rho
+import pandas as pd
+import pytest
+from black_scholes import price_batch
+import numpy as np
+
+
+class TestPriceBatch:
+
+    @pytest.fixture
+    def getChain(self):
+        rng = np.random.default_rng(7)
+        size = 200
+        return {"S": rng.uniform(10, 200, size), "K": rng.uniform(10, 200, size),
+                "T": rng.uniform(0.01, 3, size), "r": rng.uniform(0, 0.08, size),
+                "sigma": rng.uniform(0.05, 1.2, size), "kind": np.where(rng.random(size) < 0.5, "c", "p")}
+
+    def test_batch_against_py_vollib(self, getChain):
+        results = price_batch(getChain["S"], getChain["K"], getChain["T"], getChain["r"], getChain["sigma"], getChain["kind"], chunk_size=64)
+        for name, model in [("price", bs), ("delta", delta), ("gamma", gamma), ("vega", vega), ("theta", theta), ("rho", rho)]:
+            expected = [model(kind, S, K, T, r, sigma) for S, K, T, r, sigma, kind in
+                        zip(getChain["S"], getChain["K"], getChain["T"], getChain["r"], getChain["sigma"], getChain["kind"])]
+            assert np.allclose(results[name], expected, rtol=1e-9, atol=1e-12)
+
+    def test_batch_from_table(self, getChain):
+        expected = price_batch(getChain["S"], getChain["K"], getChain["T"], getChain["r"], getChain["sigma"], getChain["kind"])
+        results = price_batch(pd.DataFrame(getChain))
+        for name in expected:
+            assert np.array_equal(results[name], expected[name])
+
+    def test_batch_broadcasts_scalars(self):
+        results = price_batch([90.0, 100.0, 110.0], 100.0, 0.5, 0.01, 0.3, "call")
+        assert results["price"].shape == (3,)
+        assert np.all(np.diff(results["price"]) > 0)
+
+    def test_batch_rejects_unknown_kind(self):
+        with pytest.raises(ValueError):
+            price_batch(100.0, 100.0, 0.5, 0.01, 0.3, "straddle")
+
+    def test_batch_expired_contracts(self):
+        results = price_batch([90.0, 110.0, 100.0, 90.0, 110.0, 120.0], 100.0, [0.0, 0.0, 0.0, -0.1, 0.0, 0.5], 0.01, 0.3,
+                              ["c", "c", "c", "p", "p", "c"])
+        assert np.array_equal(results["price"][:5], [0.0, 10.0, 0.0, 10.0, 0.0])
+        assert np.array_equal(results["delta"][:5], [0.0, 1.0, 0.0, -1.0, 0.0])
+        for name in ("gamma", "vega", "theta", "rho"):
+            assert np.array_equal(results[name][:5], np.zeros(5))
+        live = price_batch(120.0, 100.0, 0.5, 0.01, 0.3, "c")
+        assert all(results[name][5] == live[name] for name in results)
+        assert np.isfinite(results["price"].sum())
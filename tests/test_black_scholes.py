@@ -101,4 +101,18 @@ class TestBlackScholes:
         assert own_put == put_vega
         own_call, own_put = testBlackScholes.calculate_greeks("Rho")
         assert own_call == call_rho
-        assert own_put == put_rho
\ No newline at end of file
+        assert own_put == put_rho
+
+    def test_grid_resolution(self, getData):
+        # Arbitrary resolution grids are evaluated in a single vectorized pass
+        testBlackScholes = BlackScholes(getData["current_underlying_price"], getData["dte"], getData["strike_price"], getData["risk_free_rate"], getData["volatility"], getData["price_range_to_display"], price_steps=500, time_steps=365)
+        grid = testBlackScholes.evaluate_grid()
+        call_prices, put_prices = grid["Value"]
+        assert call_prices.shape == (500, 365)
+        assert put_prices.shape == (500, 365)
+        for r, c in [(0, 0), (250, 100), (499, 364)]:
+            underlying_price = testBlackScholes.price_range_display[r]
+            dte = testBlackScholes.time_list_display[c]
+            assert np.isclose(call_prices[r][c], bs("c",underlying_price,getData["strike_price"],dte/365,getData["risk_free_rate"], getData["volatility"]))
+            assert np.isclose(put_prices[r][c], bs("p",underlying_price,getData["strike_price"],dte/365,getData["risk_free_rate"], getData["volatility"]))
+            assert np.isclose(grid["Delta"][0][r][c], delta("c",underlying_price,getData["strike_price"],dte/365,getData["risk_free_rate"], getData["volatility"]))
@@ -0,0 +1,33 @@
+import pytest
+from black_scholes.cache import LRUCache, freeze, make_key
+import numpy as np
+
+
+class TestLRUCache:
+
+    def test_eviction_and_counters(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1 # "a" is now most recently used
+        cache.put("c", 3)
+        assert "b" not in cache
+        assert cache.get("b") is None
+        assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 1, "evictions": 1, "hit_rate": 0.5}
+
+    def test_get_or_compute(self):
+        cache = LRUCache(maxsize=4)
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        assert cache.get_or_compute(make_key(30, 0.3), compute) == 1
+        assert cache.get_or_compute(make_key(30.0, 0.3), compute) == 1
+        assert len(calls) == 1
+
+    def test_freeze(self):
+        grid = freeze({"Value": (np.zeros((2, 2)), np.ones((2, 2)))})
+        with pytest.raises(ValueError):
+            grid["Value"][0][0, 0] = 1.0
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=0)
@@ -0,0 +1,35 @@
+import altair as alt
+from black_scholes.BlackScholes import BlackScholes
+from black_scholes.charts import ANNOTATION_CELL_LIMIT, altair_heatmap, grid_frame, matplotlib_heatmap
+from TestData.BlackScholesData import BlackScholesData
+import numpy as np
+
+
+class TestCharts:
+
+    def test_grid_frame(self):
+        values = np.arange(6, dtype=np.float64).reshape(2, 3)
+        frame = grid_frame(values, [110.0, 90.0], [30, 20, 10])
+        assert frame.shape == (6, 3)
+        assert frame["Spot Price"].tolist() == [110.0, 110.0, 110.0, 90.0, 90.0, 90.0]
+        assert frame["Days to Expiry"].tolist() == [30, 20, 10, 30, 20, 10]
+        assert frame["Value"].tolist() == values.ravel().tolist()
+
+    def test_altair_heatmap_annotations(self):
+        options = dict(alt.data_transformers.options)
+        data = BlackScholesData.test_BlackScholes_data[0]
+        small = BlackScholes(data["current_underlying_price"], data["dte"], data["strike_price"], data["risk_free_rate"], data["volatility"], data["price_range_to_display"])
+        large = BlackScholes(data["current_underlying_price"], data["dte"], data["strike_price"], data["risk_free_rate"], data["volatility"], data["price_range_to_display"], price_steps=200, time_steps=100)
+        assert len(small.price_range_display)*len(small.time_list_display) <= ANNOTATION_CELL_LIMIT
+        annotated = altair_heatmap(small.evaluate_grid()["Value"][0], small.price_range_display, small.time_list_display, "CALL")
+        assert len(annotated.to_dict()["layer"]) == 2
+        # large grids skip the text layer, building them leaves Altair's process-wide row limit alone
+        plain = altair_heatmap(large.evaluate_grid()["Value"][0], large.price_range_display, large.time_list_display, "CALL")
+        assert dict(alt.data_transformers.options) == options
+        with alt.data_transformers.enable(max_rows=None):
+            assert "layer" not in plain.to_dict()
+        assert dict(alt.data_transformers.options) == options
+
+    def test_matplotlib_heatmap(self):
+        png = matplotlib_heatmap(np.ones((2, 2)), [110.0, 90.0], [20, 10], "PUT")
+        assert png.startswith(b"\x89PNG")
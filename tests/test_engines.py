@@ -0,0 +1,122 @@
+import os
+import pytest
+from black_scholes import engines
+from black_scholes.BlackScholes import BlackScholes
+from black_scholes.engines import BinomialEngine, BlackScholesEngine, MonteCarloEngine, PricingEngine, asian_payoff
+from black_scholes.storage import open_grid_npy
+from black_scholes.vectorized import GREEKS, evaluate
+from TestData.BlackScholesData import BlackScholesData
+import numpy as np
+
+
+class TestEngines:
+
+    @pytest.fixture(params=BlackScholesData.test_BlackScholes_data)
+    def getData(self, request):
+        data = request.param
+        return (data["current_underlying_price"], data["dte"], data["strike_price"],
+                data["risk_free_rate"], data["volatility"], data["price_range_to_display"])
+
+    def test_closed_form_engine(self, getData):
+        assert BlackScholes(*getData, engine=BlackScholesEngine()).calculate_price() == BlackScholes(*getData).calculate_price()
+
+    def test_binomial_converges_to_closed_form(self, getData):
+        call_prices, put_prices = np.array(BlackScholes(*getData).calculate_price())
+        errors = []
+        for steps in (50, 200, 800):
+            call_values, put_values = np.array(BlackScholes(*getData, engine=BinomialEngine(steps, american=False)).calculate_price())
+            errors.append(max(np.abs(call_values - call_prices).max(), np.abs(put_values - put_prices).max()))
+        assert errors[0] > errors[-1]
+        assert errors[-1] <= 0.003 # within the rounding of calculate_price plus the O(1/steps) lattice error
+
+    def test_binomial_american(self, getData):
+        european = BlackScholes(*getData).evaluate_grid(("Value",))["Value"]
+        american = BlackScholes(*getData, engine=BinomialEngine(800)).evaluate_grid(("Value",))["Value"]
+        # early exercise is never optimal for a call without dividends, and is worth something for a put
+        assert np.allclose(american[0], european[0], atol=5e-3)
+        assert np.all(american[1] >= european[1] - 5e-3)
+        assert np.any(american[1] > european[1] + 1e-2)
+        intrinsic = np.maximum(getData[2] - np.array(BlackScholes(*getData).price_range_display), 0.0)[:, np.newaxis]
+        assert np.all(american[1] >= intrinsic - 1e-9)
+
+    def test_binomial_greeks(self, getData):
+        closed_form = BlackScholes(*getData).evaluate_grid()
+        lattice = BlackScholes(*getData, engine=BinomialEngine(1000, american=False)).evaluate_grid()
+        for greek in GREEKS:
+            scale = np.abs(closed_form[greek]).max()
+            # Theta is a one day difference, the closed form an instantaneous rate
+            assert np.abs(np.subtract(lattice[greek], closed_form[greek])).max() <= 0.05*scale, greek
+
+    def test_monte_carlo_converges_to_closed_form(self, getData):
+        model = BlackScholes(*getData)
+        spot, t = np.array(model.price_range_display)[:, np.newaxis], np.array(model.time_list_display)[np.newaxis, :]/365
+        closed_form = np.array(model.evaluate_grid(("Value",))["Value"])
+        call_values, put_values, call_errors, put_errors = MonteCarloEngine(100_000, seed=1).simulate(spot, t, *getData[2:5])
+        assert np.all(np.abs(np.array([call_values, put_values]) - closed_form) <= 5*np.array([call_errors, put_errors]) + 1e-6)
+        # through the grid pipeline, within the rounding of calculate_price and a few standard errors
+        call_prices, put_prices = np.array(model.calculate_price())
+        engine_call, engine_put = np.array(BlackScholes(*getData, engine=MonteCarloEngine(100_000, seed=1)).calculate_price())
+        assert np.abs(engine_call - call_prices).max() <= 5*call_errors.max() + 1e-3
+        assert np.abs(engine_put - put_prices).max() <= 5*put_errors.max() + 1e-3
+
+    def test_monte_carlo_variance_reduction(self):
+        args = (np.linspace(80, 120, 9), 0.5, 100.0, 0.02, 0.3)
+        plain = MonteCarloEngine(50_000, antithetic=False, control_variate=False).simulate(*args)[2]
+        antithetic = MonteCarloEngine(50_000, control_variate=False).simulate(*args)[2]
+        both = MonteCarloEngine(50_000).simulate(*args)[2]
+        assert np.all(antithetic < plain) and np.all(both < antithetic)
+
+    def test_monte_carlo_reproducible(self):
+        args = (np.linspace(80, 120, 5), [[0.25], [1.0]], 100.0, 0.02, 0.3)
+        expected = MonteCarloEngine(20_000, seed=7, chunk_cells=4096).option_values(*args)
+        assert np.array_equal(MonteCarloEngine(20_000, seed=7, chunk_cells=4096, workers=1).option_values(*args), expected)
+        assert np.array_equal(MonteCarloEngine(20_000, seed=7, chunk_cells=4096, workers=2, executor="process").option_values(*args), expected)
+        assert not np.array_equal(MonteCarloEngine(20_000, seed=8, chunk_cells=4096).option_values(*args), expected)
+
+    def test_monte_carlo_chunks_over_contracts(self, monkeypatch):
+        chunk = engines._simulate_chunk
+        cells = []
+        monkeypatch.setattr(engines, "_simulate_chunk", lambda seed, draws, S, *args: cells.append(draws*S.shape[0]*args[4]) or chunk(seed, draws, S, *args))
+        # 400 contracts x 12 steps do not fit one chunk of 4096 steps
+        args = (np.linspace(80, 120, 400), 0.5, 100.0, 0.02, 0.3)
+        call_values, put_values, call_errors, put_errors = MonteCarloEngine(2_000, steps=12, seed=3, chunk_cells=4096).simulate(*args)
+        assert max(cells) <= 4096
+        closed_form = evaluate(*args, ("Value",))["Value"]
+        assert np.all(np.abs(np.array([call_values, put_values]) - closed_form) <= 5*np.array([call_errors, put_errors]) + 1e-6)
+        expected = (call_values, put_values)
+        assert np.array_equal(MonteCarloEngine(2_000, steps=12, seed=3, chunk_cells=4096, workers=1).option_values(*args), expected)
+
+    def test_monte_carlo_asian(self):
+        european = evaluate(100.0, 1.0, 100.0, 0.02, 0.3, ("Value",))["Value"]
+        call_value, put_value, call_error, put_error = MonteCarloEngine(40_000, steps=12, payoff=asian_payoff).simulate(100.0, 1.0, 100.0, 0.02, 0.3)
+        # averaging lowers the volatility of the underlying seen by the payoff
+        assert 0 < call_value < european[0] and 0 < put_value < european[1]
+        assert call_error < 0.05 and put_error < 0.05
+
+    def test_expired_contracts(self):
+        for engine in (BinomialEngine(50), MonteCarloEngine(1000)):
+            call_values, put_values = engine.option_values([90.0, 110.0], 0.0, 100.0, 0.02, 0.3)
+            assert np.array_equal(call_values, [0.0, 10.0]) and np.array_equal(put_values, [10.0, 0.0])
+
+    def test_invalid_arguments(self):
+        class Incomplete(PricingEngine):
+            pass
+        with pytest.raises(TypeError):
+            Incomplete()
+        with pytest.raises(ValueError):
+            MonteCarloEngine(executor="cluster")
+        with pytest.raises(ValueError):
+            BinomialEngine(10).evaluate(100.0, 1.0, 100.0, 0.02, 0.3, ("Speed",))
+
+    def test_model_engine_updates(self, getData, tmp_path):
+        model = BlackScholes(*getData, engine=BinomialEngine(100))
+        first = model.evaluate_grid(("Value",))["Value"]
+        assert model.evaluate_grid(("Value",))["Value"] is first
+        model.update(volatility=getData[4]*1.5)
+        assert np.all(model.evaluate_grid(("Value",))["Value"][0] > first[0] - 1e-9)
+        model.update(engine=None)
+        assert model.calculate_price() == BlackScholes(*getData[:4], getData[4]*1.5, getData[5]).calculate_price()
+        model.update(engine=BinomialEngine(100))
+        columns = model.write_grid(os.path.join(tmp_path, "grid"), dtype=np.float64)
+        assert np.allclose(open_grid_npy(os.path.join(tmp_path, "grid"))["put_value"], model.evaluate_grid(("Value",))["Value"][1])
+        assert set(columns) >= {"call_value", "put_delta"}
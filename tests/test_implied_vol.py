@@ -0,0 +1,41 @@
+from py_vollib.black_scholes.implied_volatility import implied_volatility as py_vollib_iv
+import pytest
+from black_scholes import price_batch
+from black_scholes.implied_vol import implied_volatility, CONVERGED, BRACKETED, OUT_OF_BOUNDS
+import numpy as np
+
+
+class TestImpliedVolatility:
+
+    @pytest.fixture
+    def getChain(self):
+        rng = np.random.default_rng(11)
+        size = 100
+        chain = {"S": np.full(size, 100.0), "K": rng.uniform(60, 160, size),
+                 "T": rng.uniform(0.05, 2, size), "r": np.full(size, 0.02),
+                 "sigma": rng.uniform(0.1, 0.9, size), "kind": np.where(rng.random(size) < 0.5, "c", "p")}
+        chain["price"] = price_batch(chain["S"], chain["K"], chain["T"], chain["r"], chain["sigma"], chain["kind"])["price"]
+        return chain
+
+    def test_round_trip(self, getChain):
+        sigma, status = implied_volatility(getChain["price"], getChain["S"], getChain["K"], getChain["T"], getChain["r"], getChain["kind"])
+        assert np.all(status == CONVERGED)
+        assert np.allclose(sigma, getChain["sigma"], atol=1e-8)
+
+    def test_against_py_vollib(self, getChain):
+        sigma, _ = implied_volatility(getChain["price"], getChain["S"], getChain["K"], getChain["T"], getChain["r"], getChain["kind"])
+        expected = [py_vollib_iv(price, S, K, T, r, kind) for price, S, K, T, r, kind in
+                    zip(getChain["price"], getChain["S"], getChain["K"], getChain["T"], getChain["r"], getChain["kind"])]
+        assert np.allclose(sigma, expected, atol=1e-8)
+
+    def test_out_of_bounds(self):
+        # below intrinsic value, above the spot price and expired
+        sigma, status = implied_volatility([5.0, 120.0, 3.0], 110.0, 100.0, [1.0, 1.0, 0.0], 0.0, "c")
+        assert np.all(status == OUT_OF_BOUNDS)
+        assert np.all(np.isnan(sigma))
+
+    def test_deep_out_of_the_money(self):
+        price = price_batch(100.0, 400.0, 0.25, 0.01, 0.35, "c")["price"]
+        sigma, status = implied_volatility(price, 100.0, 400.0, 0.25, 0.01, "c")
+        assert status in (CONVERGED, BRACKETED)
+        assert np.isclose(sigma, 0.35, atol=1e-6)
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import pytest
+
+HEAVY_PACKAGES = ("scipy", "pandas", "matplotlib", "seaborn", "altair", "pyarrow", "streamlit")
+
+
+def loaded_modules(statement, **environ):
+    # a fresh interpreter, so modules imported by other tests do not count
+    code = f"{statement}\nimport sys\nprint(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            env=dict(os.environ, **environ), cwd=os.path.dirname(os.path.dirname(__file__)))
+    return set(result.stdout.split())
+
+
+class TestImports:
+
+    @pytest.mark.parametrize("module", ["black_scholes.BlackScholes", "black_scholes.batch", "black_scholes.implied_vol",
+                                        "black_scholes.scenario", "black_scholes.storage", "black_scholes.charts",
+                                        "black_scholes.cache", "black_scholes.service"])
+    def test_no_heavy_imports(self, module):
+        assert loaded_modules(f"import {module}").isdisjoint(HEAVY_PACKAGES)
+
+    @pytest.mark.parametrize("module", ["black_scholes.BlackScholes", "black_scholes.engines"])
+    def test_no_process_pool_imports(self, module):
+        # only the scenario engine and the service need executors at import time
+        assert loaded_modules(f"import {module}").isdisjoint(("multiprocessing", "concurrent.futures"))
+
+    def test_package_is_lazy(self):
+        modules = loaded_modules("import black_scholes")
+        assert "black_scholes.batch" not in modules and "numpy" not in modules
+        assert "black_scholes.batch" in loaded_modules("from black_scholes import price_batch")
+
+    def test_numpy_only_pricing(self):
+        statement = "from black_scholes.BlackScholes import BlackScholes\nBlackScholes(30.0, 365, 40.0, 0.01, 0.3, 90).calculate_price()"
+        assert "scipy" in loaded_modules(statement, BLACK_SCHOLES_CDF="scipy")
+        assert loaded_modules(statement, BLACK_SCHOLES_CDF="numpy").isdisjoint(HEAVY_PACKAGES)
@@ -0,0 +1,56 @@
+import pytest
+from black_scholes.BlackScholes import BlackScholes
+from black_scholes.incremental import IncrementalGrid
+from black_scholes.vectorized import evaluate_grid
+from TestData.BlackScholesData import BlackScholesData
+import numpy as np
+
+
+class TestIncrementalGrid:
+
+    @pytest.fixture(params=BlackScholesData.test_BlackScholes_data)
+    def getData(self, request):
+        return request.param
+
+    def assert_matches_fresh(self, grid, price_range, time_list_days, strike, risk_free_rate, volatility):
+        expected = evaluate_grid(price_range, time_list_days, strike, risk_free_rate, volatility)
+        actual = grid.evaluate()
+        for output, (call_values, put_values) in expected.items():
+            assert np.array_equal(actual[output][0], call_values)
+            assert np.array_equal(actual[output][1], put_values)
+
+    def test_volatility_change_keeps_independent_terms(self, getData):
+        model = BlackScholes(getData["current_underlying_price"], getData["dte"], getData["strike_price"], getData["risk_free_rate"], getData["volatility"], getData["price_range_to_display"])
+        model.evaluate_grid()
+        model.update(volatility=0.45)
+        model.evaluate_grid()
+        computed = model._grid.computed
+        assert computed["d1"] == 2
+        assert computed["log_moneyness"] == 1
+        assert computed["sqrt_t"] == 1
+        assert computed["discounted_strike"] == 1
+        self.assert_matches_fresh(model._grid, model.price_range_display, model.time_list_display, getData["strike_price"], getData["risk_free_rate"], 0.45)
+
+    def test_extending_price_range_computes_new_rows(self, getData):
+        price_range = np.linspace(20, 40, 21)
+        days = [240, 200, 120]
+        grid = IncrementalGrid(price_range, days, getData["strike_price"], getData["risk_free_rate"], getData["volatility"])
+        grid.evaluate()
+        extended = np.concatenate([np.linspace(10, 19, 10), price_range])
+        grid.update(price_range=extended)
+        assert grid.computed_rows == 10
+        assert grid.computed["log_moneyness"] == 2 and grid.computed["sqrt_t"] == 1
+        self.assert_matches_fresh(grid, extended, days, getData["strike_price"], getData["risk_free_rate"], getData["volatility"])
+
+    def test_attribute_assignment_is_picked_up(self, getData):
+        model = BlackScholes(getData["current_underlying_price"], getData["dte"], getData["strike_price"], getData["risk_free_rate"], getData["volatility"], getData["price_range_to_display"])
+        before = model.calculate_price()
+        model.risk_free_rate = 0.05
+        after = model.calculate_price()
+        assert after == BlackScholes(getData["current_underlying_price"], getData["dte"], getData["strike_price"], 0.05, getData["volatility"], getData["price_range_to_display"]).calculate_price()
+        assert after != before
+
+    def test_unknown_update(self, getData):
+        model = BlackScholes(getData["current_underlying_price"], getData["dte"], getData["strike_price"], getData["risk_free_rate"], getData["volatility"], getData["price_range_to_display"])
+        with pytest.raises(TypeError):
+            model.update(dividend_yield=0.02)
@@ -0,0 +1,66 @@
+import os
+import pstats
+import pytest
+from black_scholes import instrumentation
+from black_scholes.BlackScholes import BlackScholes
+from TestData.BlackScholesData import BlackScholesData
+import numpy as np
+
+
+class TestInstrumentation:
+
+    @pytest.fixture
+    def getEnabled(self):
+        was_enabled = instrumentation.is_enabled()
+        instrumentation.reset()
+        instrumentation.enable()
+        yield
+        instrumentation.reset()
+        if not was_enabled:
+            instrumentation.disable()
+
+    @pytest.fixture
+    def getModel(self):
+        data = BlackScholesData.test_BlackScholes_data[0]
+        return BlackScholes(data["current_underlying_price"], data["dte"], data["strike_price"],
+                            data["risk_free_rate"], data["volatility"], data["price_range_to_display"])
+
+    def test_disabled_records_nothing(self, getModel):
+        instrumentation.disable()
+        instrumentation.reset()
+        getModel.calculate_price()
+        assert instrumentation.snapshot() == {"stages": {}, "counters": {}}
+
+    def test_stages_and_counters(self, getEnabled, getModel):
+        getModel.calculate_price()
+        getModel.calculate_price()
+        getModel.calculate_greeks("Delta")
+        BlackScholes.calculate_pnl(np.ones((3, 4)), 0.5, 'P/L $')
+        metrics = instrumentation.snapshot()
+        assert metrics["stages"]["calculate_price"]["calls"] == 2
+        assert metrics["stages"]["calculate_greeks"]["calls"] == 1
+        assert metrics["stages"]["evaluate_grid"]["calls"] == 3
+        assert metrics["stages"]["pnl"]["calls"] == 1
+        stats = metrics["stages"]["evaluate_grid"]
+        assert 0 < stats["p50_ms"] <= stats["max_ms"] <= stats["total_ms"]
+        cells = len(getModel.price_range_display)*len(getModel.time_list_display)
+        assert metrics["counters"]["grid_cells"] == 3*cells
+        assert metrics["counters"]["pnl_cells"] == 12
+        # the second price evaluation reuses every term
+        assert metrics["counters"]["terms_computed"] == sum(getModel._grid.computed.values())
+
+    def test_exports(self, getEnabled, getModel, tmp_path):
+        getModel.calculate_price()
+        text = instrumentation.prometheus_text()
+        assert 'black_scholes_stage_seconds_count{stage="calculate_price"} 1' in text
+        assert 'black_scholes_total{counter="grid_cells"}' in text
+        path = os.path.join(tmp_path, "metrics.json")
+        instrumentation.export_json(path)
+        assert os.path.getsize(path) > 0
+
+    def test_profile(self, getModel, tmp_path):
+        path = os.path.join(tmp_path, "rerun.prof")
+        with instrumentation.profile(path) as profiler:
+            getModel.calculate_greeks("Vega")
+        assert "calculate_greeks" in instrumentation.profile_report(profiler)
+        assert any(name == "calculate_greeks" for _, _, name in pstats.Stats(path).stats)
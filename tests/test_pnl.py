@@ -0,0 +1,40 @@
+import pytest
+from black_scholes.BlackScholes import BlackScholes
+from black_scholes.pnl import LONG, SHORT, iter_pnl, pnl
+import numpy as np
+
+
+class TestPnl:
+
+    @pytest.fixture
+    def getValues(self):
+        return np.array([[10.0, 12.5], [7.5, 5.0]])
+
+    def test_list_compatibility(self, getValues):
+        assert BlackScholes.calculate_pnl(getValues.tolist(), 10.0, 'P/L $') == [[0.0, 2.5], [-2.5, -5.0]]
+        assert BlackScholes.calculate_pnl(getValues.tolist(), 10.0, 'P/L %') == [[0.0, 25.0], [-25.0, -50.0]]
+
+    def test_unknown_denomination(self, getValues):
+        with pytest.raises(ValueError):
+            BlackScholes.calculate_pnl(getValues.tolist(), 10.0, 'Value')
+
+    def test_output_buffer(self, getValues):
+        out = np.empty_like(getValues)
+        result = BlackScholes.calculate_pnl(getValues, 10.0, 'P/L %', quantity=2, side=SHORT, out=out)
+        assert result is out
+        assert np.allclose(out, [[0.0, -25.0], [25.0, 50.0]])
+
+    def test_multi_leg(self, getValues):
+        # long 2 contracts at 10, short 1 contract at 4 on a second grid
+        legs = np.stack([getValues, getValues/2])
+        result = pnl(legs, [10.0, 4.0], 'P/L $', quantity=[2, 1], side=[LONG, SHORT])
+        expected = 2*(getValues - 10.0) - (getValues/2 - 4.0)
+        assert np.allclose(result, expected)
+        result = pnl(legs, [10.0, 4.0], 'P/L %', quantity=[2, 1], side=[LONG, SHORT])
+        assert np.allclose(result, expected/24.0*100)
+
+    def test_streaming(self, getValues):
+        values = np.tile(getValues, (5, 1))
+        chunks = [values[i:i+4] for i in range(0, values.shape[0], 4)]
+        streamed = np.concatenate([chunk.copy() for chunk in iter_pnl(chunks, 10.0, 'P/L $')])
+        assert np.array_equal(streamed, pnl(values, 10.0, 'P/L $'))
@@ -0,0 +1,45 @@
+import os
+import pytest
+from black_scholes import price_batch
+from black_scholes.scenario import Portfolio, scenario_cube
+import numpy as np
+
+
+class TestScenarioCube:
+
+    @pytest.fixture
+    def getPortfolio(self):
+        rng = np.random.default_rng(5)
+        size = 25
+        return Portfolio(strike=rng.uniform(80, 120, size), time_to_exp_days=rng.integers(10, 400, size),
+                         volatility=rng.uniform(0.1, 0.6, size), kind=np.where(rng.random(size) < 0.5, "c", "p"),
+                         quantity=rng.integers(-5, 6, size), risk_free_rate=0.02)
+
+    def test_against_price_batch(self, getPortfolio):
+        spot, vol_shifts, rate_shifts, days_elapsed = np.linspace(60, 140, 9), [-0.05, 0.0, 0.05], [0.0, 0.01], [0, 5]
+        cube = scenario_cube(getPortfolio, spot, vol_shifts, rate_shifts, days_elapsed, chunk_cells=100, workers=3)
+        assert cube.shape == (9, 3, 2, 2)
+        for s, v, r, t in [(0, 0, 0, 0), (4, 1, 1, 1), (8, 2, 0, 1)]:
+            prices = price_batch(spot[s], getPortfolio.strike, (getPortfolio.time_to_exp_days - days_elapsed[t])/365,
+                                 0.02 + rate_shifts[r], getPortfolio.volatility + vol_shifts[v], getPortfolio.calls)["price"]
+            assert np.isclose(cube[s, v, r, t], prices @ getPortfolio.quantity)
+
+    def test_expired_legs_use_intrinsic_value(self):
+        portfolio = Portfolio(strike=[100.0, 100.0], time_to_exp_days=[10, 10], volatility=0.3, kind=["c", "p"], quantity=[1, 2])
+        cube = scenario_cube(portfolio, [90.0, 120.0], days_elapsed=[10, 30])
+        assert np.allclose(cube[:, 0, 0, :], [[20.0, 20.0], [20.0, 20.0]])
+
+    def test_process_executor_writes_memmap(self, getPortfolio, tmp_path):
+        args = (getPortfolio, np.linspace(60, 140, 5), [-0.05, 0.05], [0.0], [0, 30])
+        expected = scenario_cube(*args)
+        cube = scenario_cube(*args, out=str(tmp_path / "cube.dat"), chunk_cells=100, workers=2, executor="process")
+        assert isinstance(cube, np.memmap)
+        assert np.allclose(cube, expected)
+        assert os.path.getsize(tmp_path / "cube.dat") == expected.nbytes
+
+    def test_invalid_executor(self, getPortfolio):
+        with pytest.raises(ValueError):
+            scenario_cube(getPortfolio, [100.0], executor="gpu")
+        # process workers need a file the caller owns
+        with pytest.raises(ValueError):
+            scenario_cube(getPortfolio, [100.0], executor="process")
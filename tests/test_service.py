@@ -0,0 +1,126 @@
+import asyncio
+import json
+import pytest
+from black_scholes import price_batch
+from black_scholes.BlackScholes import BlackScholes
+from black_scholes.service import PricingService, ServiceClient
+from TestData.BlackScholesData import BlackScholesData
+import numpy as np
+
+
+class TestPricingService:
+
+    @pytest.fixture
+    def getService(self):
+        service = PricingService(workers=2, max_delay=0.005)
+        yield service
+        service.close()
+
+    @pytest.fixture(params=BlackScholesData.test_BlackScholes_data)
+    def getData(self, request):
+        return request.param
+
+    def test_concurrent_requests_are_batched(self, getService):
+        client = ServiceClient(getService)
+        strikes = np.linspace(80, 120, 50)
+
+        async def run():
+            return await asyncio.gather(*(client.post("/price", {"S": 100.0, "K": float(K), "T": 0.5, "r": 0.01, "sigma": 0.3, "kind": "c"})
+                                          for K in strikes))
+        responses = asyncio.run(run())
+        assert all(status == 200 for status, _ in responses)
+        expected = price_batch(100.0, strikes, 0.5, 0.01, 0.3, "c")["price"]
+        assert np.allclose([payload["price"] for _, payload in responses], expected)
+        assert getService.batcher.batches < len(strikes)
+        assert getService.batcher.contracts == len(strikes)
+
+    def test_greeks(self, getService):
+        client = ServiceClient(getService)
+        status, payload = asyncio.run(client.post("/greeks", {"S": [90.0, 110.0], "K": 100.0, "T": 1.0, "r": 0.02, "sigma": 0.25, "kind": ["c", "p"]}))
+        assert status == 200
+        expected = price_batch([90.0, 110.0], 100.0, 1.0, 0.02, 0.25, ["c", "p"])
+        for name, values in expected.items():
+            assert np.allclose(payload[name], values)
+
+    def test_grid(self, getService, getData):
+        client = ServiceClient(getService)
+        arguments = {"current_underlying_price": getData["current_underlying_price"], "time_to_exp_days": getData["dte"],
+                     "strike_price": getData["strike_price"], "risk_free_rate": getData["risk_free_rate"],
+                     "volatility": getData["volatility"], "price_range_to_display": getData["price_range_to_display"]}
+        status, payload = asyncio.run(client.post("/grid", dict(arguments, outputs=["Value"])))
+        assert status == 200
+        call_prices, put_prices = BlackScholes(*arguments.values()).calculate_price()
+        assert np.round(payload["Value"]["call"], 3).tolist() == call_prices
+        assert np.round(payload["Value"]["put"], 3).tolist() == put_prices
+        assert "Delta" not in payload
+
+    def test_grid_rejects_unsafe_arguments(self, getService):
+        client = ServiceClient(getService)
+        arguments = {"current_underlying_price": 30.0, "time_to_exp_days": 240, "strike_price": 40.0,
+                     "risk_free_rate": 0.01, "volatility": 0.3, "price_range_to_display": 20}
+
+        async def run(body):
+            return await client.post("/grid", dict(arguments, outputs=["Value"], **body))
+        for body in ({"engine": "binomial"}, {"price_steps": 10**7}, {"time_steps": 0}, {"price_steps": True},
+                     {"time_to_exp_days": 12.5}, {"volatility": "0.3"}):
+            status, payload = asyncio.run(run(body))
+            assert status == 400, body
+        status, payload = asyncio.run(run({"price_steps": 50, "time_steps": 20}))
+        assert status == 200
+        assert np.shape(payload["Value"]["call"]) == (50, 20)
+
+    def test_expired_and_undefined_results(self, getService):
+        client = ServiceClient(getService)
+        status, payload = asyncio.run(client.post("/price", {"S": [110.0, -5.0], "K": 100.0, "T": [0.0, 0.5], "r": 0.01,
+                                                             "sigma": 0.3, "kind": "c"}))
+        assert status == 200
+        # intrinsic value at expiry, null instead of NaN where the price is undefined
+        assert payload["price"] == [10.0, None]
+        json.dumps(payload, allow_nan=False)
+
+    def test_pnl(self, getService):
+        client = ServiceClient(getService)
+        status, payload = asyncio.run(client.post("/pnl", {"values": [[12.0, 8.0]], "premium": 10.0, "denomination": "P/L %"}))
+        assert status == 200
+        assert payload["pnl"] == [[20.0, -20.0]]
+
+    def test_errors_and_metrics(self, getService):
+        client = ServiceClient(getService)
+
+        async def run():
+            bad_kind = await client.post("/price", {"S": 100.0, "K": 100.0, "T": 0.5, "r": 0.01, "sigma": 0.3, "kind": "x"})
+            missing = await client.post("/price", {"S": 100.0})
+            unknown = await client.get("/nothing")
+            wrong_method = await client.get("/price")
+            metrics = await client.get("/metrics")
+            return bad_kind, missing, unknown, wrong_method, metrics
+        bad_kind, missing, unknown, wrong_method, metrics = asyncio.run(run())
+        assert bad_kind[0] == 400 and missing[0] == 400
+        assert unknown[0] == 404 and wrong_method[0] == 405
+        assert metrics[1]["endpoints"]["/price"]["count"] == 2
+        assert metrics[1]["endpoints"]["/price"]["errors"] == 2
+
+    def test_http_round_trip(self, getService):
+        async def run():
+            server = await getService.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for strike in (90.0, 110.0): # two requests on one keep-alive connection
+                body = json.dumps({"S": 100.0, "K": strike, "T": 0.5, "r": 0.01, "sigma": 0.3, "kind": "p"}).encode()
+                writer.write(b"POST /price HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                             + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+                status_line = await reader.readline()
+                headers = {}
+                while (line := await reader.readline()) != b"\r\n":
+                    name, _, value = line.decode().partition(":")
+                    headers[name.lower()] = value.strip()
+                responses.append((status_line, json.loads(await reader.readexactly(int(headers["content-length"])))))
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return responses
+        responses = asyncio.run(run())
+        assert [status_line for status_line, _ in responses] == [b"HTTP/1.1 200 OK\r\n"]*2
+        assert np.allclose([payload["price"] for _, payload in responses], price_batch(100.0, [90.0, 110.0], 0.5, 0.01, 0.3, "p")["price"])
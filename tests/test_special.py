@@ -0,0 +1,72 @@
+from py_vollib.black_scholes import black_scholes as bs
+from scipy.special import ndtr
+from scipy.stats import norm
+import pytest
+from black_scholes import special
+from black_scholes.BlackScholes import BlackScholes
+from black_scholes.special import norm_cdf, norm_pdf
+from black_scholes.vectorized import evaluate, evaluate_grid
+from TestData.BlackScholesData import BlackScholesData
+import numpy as np
+
+
+class TestSpecial:
+
+    @pytest.fixture
+    def getPoints(self):
+        return np.linspace(-40, 40, 400001)
+
+    @pytest.fixture(params=BlackScholesData.test_BlackScholes_data)
+    def getData(self, request):
+        return request.param
+
+    def test_matches_scipy_stats(self, getPoints, monkeypatch):
+        monkeypatch.setattr(special, "_ndtr", ndtr) # whatever BLACK_SCHOLES_CDF selects
+        assert np.array_equal(norm_cdf(getPoints), norm.cdf(getPoints))
+        assert np.array_equal(norm_pdf(getPoints), norm.pdf(getPoints))
+        assert norm_cdf(0.0) == 0.5
+
+    def test_hart_error_bounds(self, getPoints):
+        reference = ndtr(getPoints)
+        approximation = special._hart_cdf(getPoints)
+        assert np.max(np.abs(approximation - reference)) < 3e-16
+        tail = (getPoints < 0) & (getPoints > -37)
+        assert np.max(np.abs(approximation[tail] - reference[tail])/reference[tail]) < 1e-8
+        for x in (-40.0, -8.0, 0.0, 1.5, 8.0):
+            value = special._hart_cdf(np.float64(x))
+            assert np.ndim(value) == 0 and abs(value - ndtr(x)) < 3e-16
+        assert special._hart_cdf(getPoints.reshape(-1, 1)[:4]).shape == (4, 1)
+
+    def test_numpy_only_pricing(self, monkeypatch):
+        # as selected by BLACK_SCHOLES_CDF=numpy
+        monkeypatch.setattr(special, "_ndtr", special._hart_cdf)
+        values = evaluate(100.0, 1.0, 100.0, 0.02, 0.3, ("Value", "Delta"))
+        assert np.ndim(values["Value"][0]) == 0
+        assert np.isclose(values["Value"][0], bs("c", 100.0, 100.0, 1.0, 0.02, 0.3), rtol=1e-12)
+        assert np.isclose(values["Value"][1], bs("p", 100.0, 100.0, 1.0, 0.02, 0.3), rtol=1e-12)
+
+    def test_float32_error_bounds(self, getPoints):
+        cdf = norm_cdf(getPoints, dtype=np.float32)
+        pdf = norm_pdf(getPoints, dtype=np.float32)
+        assert cdf.dtype == np.float32 and pdf.dtype == np.float32
+        assert np.max(np.abs(cdf - ndtr(getPoints))) < 1e-7
+        assert np.max(np.abs(special._hart_cdf(getPoints.astype(np.float32)).astype(np.float32) - ndtr(getPoints))) < 1e-7
+        reference = norm.pdf(getPoints)
+        assert np.max(np.abs(pdf - reference)) < 1e-7
+        central = np.abs(getPoints) < 4
+        assert np.max(np.abs(pdf[central] - reference[central])/reference[central]) < 1e-6
+
+    def test_pricing_without_scipy(self, getData, monkeypatch):
+        # Hart's algorithm must reproduce the py_vollib comparison to 3 decimals
+        expected = BlackScholes(getData["current_underlying_price"], getData["dte"], getData["strike_price"], getData["risk_free_rate"], getData["volatility"], getData["price_range_to_display"]).calculate_price()
+        monkeypatch.setattr(special, "_ndtr", special._hart_cdf)
+        assert BlackScholes(getData["current_underlying_price"], getData["dte"], getData["strike_price"], getData["risk_free_rate"], getData["volatility"], getData["price_range_to_display"]).calculate_price() == expected
+
+    def test_float32_grid(self, getData):
+        model = BlackScholes(getData["current_underlying_price"], getData["dte"], getData["strike_price"], getData["risk_free_rate"], getData["volatility"], getData["price_range_to_display"])
+        call_values, put_values = evaluate_grid(model.price_range_display, model.time_list_display, getData["strike_price"], getData["risk_free_rate"], getData["volatility"], dtype=np.float32)["Value"]
+        assert call_values.dtype == np.float32
+        for r, underlying_price in enumerate(model.price_range_display):
+            for c, dte in enumerate(model.time_list_display):
+                assert np.isclose(call_values[r][c], bs("c",underlying_price,getData["strike_price"],dte/365,getData["risk_free_rate"], getData["volatility"]), rtol=1e-4, atol=1e-5)
+                assert np.isclose(put_values[r][c], bs("p",underlying_price,getData["strike_price"],dte/365,getData["risk_free_rate"], getData["volatility"]), rtol=1e-4, atol=1e-5)
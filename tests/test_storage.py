@@ -0,0 +1,44 @@
+import pytest
+from black_scholes.BlackScholes import BlackScholes
+from black_scholes.storage import GRID_COLUMNS, open_grid_arrow, open_grid_npy, write_grid_npy
+from TestData.BlackScholesData import BlackScholesData
+import numpy as np
+
+
+class TestStorage:
+
+    @pytest.fixture(params=BlackScholesData.test_BlackScholes_data)
+    def getModel(self, request):
+        data = request.param
+        return BlackScholes(data["current_underlying_price"], data["dte"], data["strike_price"], data["risk_free_rate"], data["volatility"], data["price_range_to_display"], price_steps=50, time_steps=30)
+
+    def test_npy_round_trip(self, getModel, tmp_path):
+        grid = getModel.evaluate_grid()
+        # small chunks so the grid is written over several blocks of rows
+        write_grid_npy(str(tmp_path), getModel.price_range_display, getModel.time_list_display, getModel.strike_price,
+                       getModel.risk_free_rate, getModel.volatility, dtype=np.float64, chunk_cells=200)
+        columns = open_grid_npy(str(tmp_path))
+        assert isinstance(columns["call_value"], np.memmap)
+        assert np.array_equal(columns["spot"], getModel.price_range_display)
+        assert np.array_equal(columns["call_value"], grid["Value"][0])
+        assert np.array_equal(columns["put_theta"], grid["Theta"][1])
+
+    def test_arrow_round_trip(self, getModel, tmp_path):
+        grid = getModel.evaluate_grid()
+        path = getModel.write_grid(str(tmp_path / "grid.arrow"), format="arrow")
+        table = open_grid_arrow(path)
+        assert table.num_rows == 50*30
+        assert set(GRID_COLUMNS) <= set(table.column_names)
+        call_delta = table.column("call_delta").to_numpy().reshape(50, 30)
+        assert call_delta.dtype == np.float32
+        assert np.allclose(call_delta, grid["Delta"][0], rtol=1e-6)
+
+    def test_parquet(self, getModel, tmp_path):
+        import pyarrow.parquet as pq
+        path = getModel.write_grid(str(tmp_path / "grid.parquet"), format="parquet")
+        table = pq.read_table(path, columns=["spot", "days", "put_value"])
+        assert np.allclose(table.column("put_value").to_numpy().reshape(50, 30), getModel.evaluate_grid()["Value"][1], rtol=1e-6)
+
+    def test_unknown_format(self, getModel, tmp_path):
+        with pytest.raises(ValueError):
+            getModel.write_grid(str(tmp_path / "grid.csv"), format="csv")